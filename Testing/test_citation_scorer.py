@@ -144,6 +144,45 @@ class TestCacheParameterValidation:
         assert new_cache['build_params']['max_citations'] == 20
 
 
+@pytest.mark.unit
+class TestBuildLibraryNetwork:
+    """Tests for building the citation network."""
+
+    def test_duplicate_works_fetched_once(self, temp_cache_dir):
+        """Test that library items resolving to the same work share one citation fetch."""
+        mock_client = Mock()
+        mock_client.find_work_by_doi.return_value = {'openalex_id': 'LIB1'}
+        mock_client.get_citations.return_value = [{'openalex_id': 'W1'}, {'openalex_id': 'W2'}]
+
+        papers = [
+            {'title': 'Preprint', 'doi': '10.1234/a', 'zotero_key': 'KEY1'},
+            {'title': 'Published', 'doi': '10.1234/a', 'zotero_key': 'KEY2'},
+        ]
+
+        scorer = CitationScorer(cache_dir=temp_cache_dir)
+        scorer.build_library_network(mock_client, papers, force_rebuild=True)
+
+        assert mock_client.get_citations.call_count == 1
+        assert scorer.openalex_id_map == {'KEY1': 'LIB1', 'KEY2': 'LIB1'}
+        assert dict(scorer.citation_network) == {'W1': {'LIB1'}, 'W2': {'LIB1'}}
+
+    def test_force_rebuild_refreshes_http_cache(self, temp_cache_dir):
+        """Test that a forced rebuild fetches citations past the HTTP cache."""
+        mock_client = Mock()
+        mock_client.refresh_http_cache = False
+        refresh_during_fetch = []
+        mock_client.find_work_by_doi.return_value = {'openalex_id': 'LIB1'}
+        mock_client.get_citations.side_effect = lambda *args, **kwargs: (
+            refresh_during_fetch.append(mock_client.refresh_http_cache) or [{'openalex_id': 'W1'}]
+        )
+
+        scorer = CitationScorer(cache_dir=temp_cache_dir)
+        scorer.build_library_network(mock_client, [{'title': 'Paper', 'doi': '10.1234/a'}], force_rebuild=True)
+
+        assert refresh_during_fetch == [True]
+        assert mock_client.refresh_http_cache is False
+
+
 @pytest.mark.unit
 class TestComputeCitationScores:
     """Tests for computing citation scores."""
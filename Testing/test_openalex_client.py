@@ -3,12 +3,25 @@ Pytest tests for OpenAlexClient.
 """
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+import json
 import pickle
 import os
+import threading
+import time
+import requests
 
 from src.openalex_client import OpenAlexClient
 
 
+def _json_response(payload, status_code=200):
+    """Build a mock response carrying both the raw body and its decoded JSON."""
+    response = Mock()
+    response.status_code = status_code
+    response.content = json.dumps(payload).encode()
+    response.json.return_value = payload
+    return response
+
+
 @pytest.mark.unit
 class TestOpenAlexClientInit:
     """Tests for OpenAlexClient initialization."""
@@ -53,9 +66,7 @@ class TestJournalCaching:
     def test_find_source_caching(self, mock_request, temp_cache_dir):
         """Test that journal lookups are cached."""
         # Mock API response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = _json_response({
             'results': [{
                 'id': 'https://openalex.org/S123',
                 'display_name': 'Nature',
@@ -63,7 +74,7 @@ class TestJournalCaching:
                 'issn': ['0028-0836'],
                 'type': 'journal'
             }]
-        }
+        })
         mock_request.return_value = mock_response
 
         client = OpenAlexClient(cache_dir=temp_cache_dir)
@@ -83,6 +94,20 @@ class TestJournalCaching:
         assert mock_request.call_count == 1
         assert result3 == result1
 
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_find_source_error_not_cached(self, mock_request, temp_cache_dir):
+        """Test that a failed lookup is retried, while a genuine miss is cached."""
+        mock_request.return_value = None
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+
+        assert client.find_source_by_name('Nature') is None
+        assert 'nature' not in client.journal_cache
+
+        mock_request.return_value = _json_response({'results': []})
+        assert client.find_source_by_name('Nature') is None
+        assert client.find_source_by_name('Nature') is None
+        assert mock_request.call_count == 2
+
 
 @pytest.mark.unit
 class TestFindWorkByDOI:
@@ -91,9 +116,7 @@ class TestFindWorkByDOI:
     @patch.object(OpenAlexClient, '_make_request')
     def test_find_work_success(self, mock_request, temp_cache_dir, mock_openalex_work):
         """Test successful work lookup by DOI."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = mock_openalex_work
+        mock_response = _json_response(mock_openalex_work)
         mock_request.return_value = mock_response
 
         client = OpenAlexClient(cache_dir=temp_cache_dir)
@@ -104,6 +127,18 @@ class TestFindWorkByDOI:
         assert result['title'] == 'Sample Research Paper'
         assert result['doi'] == '10.1234/sample'
 
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_find_work_memoized(self, mock_request, temp_cache_dir, mock_openalex_work):
+        """Test that repeated DOI lookups reuse the first response."""
+        mock_request.return_value = _json_response(mock_openalex_work)
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        first = client.find_work_by_doi('10.1234/sample')
+        second = client.find_work_by_doi('https://doi.org/10.1234/sample')
+
+        assert mock_request.call_count == 1
+        assert second == first
+
     @patch.object(OpenAlexClient, '_make_request')
     def test_find_work_not_found(self, mock_request, temp_cache_dir):
         """Test work lookup with invalid DOI."""
@@ -114,6 +149,67 @@ class TestFindWorkByDOI:
 
         assert result is None
 
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_find_work_requests_selected_fields(self, mock_request, temp_cache_dir):
+        """Test that work lookups only request fields used by _parse_work."""
+        mock_request.return_value = None
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client.find_work_by_doi('10.1234/sample')
+
+        params = mock_request.call_args.kwargs['params']
+        assert params['select'] == OpenAlexClient._WORK_SELECT
+        assert 'open_access' in params['select'].split(',')
+
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_find_works_by_dois_batches(self, mock_request, temp_cache_dir):
+        """Test batched DOI lookup preserves input order and fills the DOI cache."""
+        mock_request.return_value = _json_response({
+            'results': [
+                {'id': 'https://openalex.org/W2', 'doi': 'https://doi.org/10.1234/b'},
+                {'id': 'https://openalex.org/W1', 'doi': 'https://doi.org/10.1234/a'},
+            ]
+        })
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        results = client.find_works_by_dois(['10.1234/A', 'https://doi.org/10.1234/b', '10.1234/missing'])
+
+        assert list(results) == ['10.1234/a', '10.1234/b', '10.1234/missing']
+        assert results['10.1234/a']['openalex_id'] == 'W1'
+        assert results['10.1234/missing'] is None
+        assert mock_request.call_count == 1
+        assert mock_request.call_args.kwargs['params']['filter'] == \
+            'doi:10.1234/a|10.1234/b|10.1234/missing'
+
+        # Single lookups, including batch misses, are now served from the in-process cache
+        assert client.find_work_by_doi('10.1234/b')['openalex_id'] == 'W2'
+        assert client.find_work_by_doi('10.1234/missing') is None
+        assert mock_request.call_count == 1
+
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_find_works_by_dois_chunks_of_50(self, mock_request, temp_cache_dir):
+        """Test that large DOI lists are split into 50-DOI requests."""
+        mock_request.return_value = _json_response({'results': []})
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client.find_works_by_dois([f'10.1234/{i}' for i in range(120)])
+
+        assert mock_request.call_count == 3
+
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_find_works_by_dois_truncated_page_misses_not_cached(self, mock_request, temp_cache_dir):
+        """Test that DOIs missing from a truncated page are looked up again."""
+        mock_request.return_value = _json_response({
+            'meta': {'count': 201},
+            'results': [{'id': 'https://openalex.org/W1', 'doi': 'https://doi.org/10.1234/a'}]
+        })
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client.find_works_by_dois(['10.1234/a', '10.1234/b'])
+
+        assert '10.1234/b' not in client._doi_cache
+        assert mock_request.call_args.kwargs['params']['per_page'] == 200
+
     def test_find_work_empty_doi(self, temp_cache_dir):
         """Test with empty DOI."""
         client = OpenAlexClient(cache_dir=temp_cache_dir)
@@ -128,14 +224,12 @@ class TestCitationsAndReferences:
     @patch.object(OpenAlexClient, '_make_request')
     def test_get_citations(self, mock_request, temp_cache_dir):
         """Test getting citations for a work."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = _json_response({
             'results': [
                 {'id': 'https://openalex.org/W1', 'title': 'Citing Paper 1'},
                 {'id': 'https://openalex.org/W2', 'title': 'Citing Paper 2'}
             ]
-        }
+        })
         mock_request.return_value = mock_response
 
         client = OpenAlexClient(cache_dir=temp_cache_dir)
@@ -148,13 +242,11 @@ class TestCitationsAndReferences:
     @patch.object(OpenAlexClient, '_make_request')
     def test_get_references(self, mock_request, temp_cache_dir):
         """Test getting references for a work."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = _json_response({
             'results': [
                 {'id': 'https://openalex.org/W3', 'title': 'Reference 1'}
             ]
-        }
+        })
         mock_request.return_value = mock_response
 
         client = OpenAlexClient(cache_dir=temp_cache_dir)
@@ -164,6 +256,60 @@ class TestCitationsAndReferences:
         assert results[0]['openalex_id'] == 'W3'
 
 
+@pytest.mark.unit
+class TestSearchRecentPapers:
+    """Tests for paginated recent-paper search."""
+
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_paginates_and_parses(self, mock_request, temp_cache_dir):
+        """Test that pages are parsed as they arrive and the limit is applied."""
+        mock_request.side_effect = [
+            _json_response({
+                'meta': {'count': 3, 'next_cursor': 'abc'},
+                'results': [{'id': 'https://openalex.org/W1'}, {'id': 'https://openalex.org/W2'}]
+            }),
+            _json_response({
+                'meta': {'count': 3, 'next_cursor': None},
+                'results': [{'id': 'https://openalex.org/W3'}]
+            }),
+        ]
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        results = client.search_recent_papers('2024-01-01', limit=None)
+
+        assert [r['openalex_id'] for r in results] == ['W1', 'W2', 'W3']
+        assert mock_request.call_count == 2
+
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_iter_fetches_pages_lazily(self, mock_request, temp_cache_dir):
+        """Test that the generator only requests a page when it is consumed."""
+        mock_request.return_value = _json_response({
+            'meta': {'count': 400, 'next_cursor': 'abc'},
+            'results': [{'id': 'https://openalex.org/W1'}]
+        })
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        papers = client.iter_recent_papers('2024-01-01')
+
+        assert mock_request.call_count == 0
+        assert next(papers)['openalex_id'] == 'W1'
+        assert mock_request.call_count == 1
+
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_stops_at_limit(self, mock_request, temp_cache_dir):
+        """Test that pagination stops once the limit is reached."""
+        mock_request.return_value = _json_response({
+            'meta': {'count': 400, 'next_cursor': 'abc'},
+            'results': [{'id': f'https://openalex.org/W{i}'} for i in range(3)]
+        })
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        results = client.search_recent_papers('2024-01-01', limit=2)
+
+        assert len(results) == 2
+        assert mock_request.call_count == 1
+
+
 @pytest.mark.unit
 class TestWorkParsing:
     """Tests for parsing OpenAlex work data."""
@@ -219,6 +365,21 @@ class TestWorkParsing:
 
         assert abstract == 'This is a test that is working'
 
+    def test_abstract_reconstruction_sparse_positions(self, temp_cache_dir):
+        """Test that gaps in the inverted index positions are skipped."""
+        work = {
+            'abstract_inverted_index': {
+                'Gaps': [0],
+                'are': [2],
+                'skipped': [5]
+            }
+        }
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        abstract = client._get_abstract(work)
+
+        assert abstract == 'Gaps are skipped'
+
     def test_empty_abstract(self, temp_cache_dir):
         """Test handling of empty abstract."""
         work = {'abstract_inverted_index': {}}
@@ -229,12 +390,142 @@ class TestWorkParsing:
         assert abstract == ''
 
 
+@pytest.mark.unit
+class TestRateLimiting:
+    """Tests for the adaptive, header-aware rate limiter."""
+
+    @staticmethod
+    def _response(status_code, headers=None):
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(headers or {})
+        response._content = b'{}'
+        return response
+
+    def test_429_halves_rate(self, temp_cache_dir):
+        """Test that repeated 429s slow the client down, then give up."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client.session.get = Mock(return_value=self._response(429, {'Retry-After': '0'}))
+
+        response = client._make_request('https://api.openalex.org/works')
+
+        assert response is None
+        assert client.session.get.call_count == client.MAX_RATE_LIMIT_RETRIES + 1
+        assert client._rate_limit == 1.0
+
+    def test_429_retried_through_limiter(self, temp_cache_dir):
+        """Test that a 429 is retried after the limiter backs off."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client.session.get = Mock(side_effect=[
+            self._response(429, {'Retry-After': '0'}),
+            self._response(200)
+        ])
+
+        response = client._make_request('https://api.openalex.org/works')
+
+        assert response.status_code == 200
+        assert client.session.get.call_count == 2
+        assert client._rate_limit == 5.5
+
+    def test_retry_after_is_capped(self, temp_cache_dir):
+        """Test that a huge Retry-After pauses for at most MAX_RETRY_AFTER."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        before = time.monotonic()
+
+        client._update_rate_limit(self._response(429, {'Retry-After': '86400'}))
+
+        assert client._throttled_until <= before + client.MAX_RETRY_AFTER + 1
+
+    def test_success_recovers_rate(self, temp_cache_dir):
+        """Test that successful responses additively restore the rate."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client._rate_limit = 5.0
+        client.session.get = Mock(return_value=self._response(200))
+
+        response = client._make_request('https://api.openalex.org/works')
+
+        assert response.status_code == 200
+        assert client._rate_limit == 5.5
+
+    def test_cached_response_refunds_token(self, temp_cache_dir):
+        """Test that HTTP-cache hits do not consume rate-limit budget."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client._rate_limit = 5.0
+        client._tokens = 0.0
+        response = self._response(200)
+        response.from_cache = True
+
+        client._update_rate_limit(response)
+
+        assert client._tokens >= 1.0
+        assert client._rate_limit == 5.0
+
+    def test_session_retries_configured(self, temp_cache_dir):
+        """Test that the session adapter retries server errors but not 429s."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        adapter = client.session.get_adapter('https://api.openalex.org')
+
+        assert 503 in adapter.max_retries.status_forcelist
+        assert 429 not in adapter.max_retries.status_forcelist
+        assert adapter.max_retries.total == 3
+
+    def test_exhausted_budget_pauses_requests(self, temp_cache_dir):
+        """Test that a zero remaining budget schedules a pause."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client._update_rate_limit(self._response(200, {'x-ratelimit-remaining-requests': '0'}))
+
+        assert client._throttled_until > 0
+
+    def test_token_bucket_limits_requests(self, temp_cache_dir):
+        """Test that requests beyond the bucket wait for tokens to refill."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client._rate_limit = 20.0
+        client._tokens = 2.0
+
+        start = time.monotonic()
+        for _ in range(3):
+            client._wait_if_throttled()
+
+        # Third request had to wait for roughly one token (1/20 s) to refill
+        assert time.monotonic() - start >= 0.04
+
+    def test_token_bucket_concurrent_threads(self, temp_cache_dir):
+        """Test that concurrent threads all eventually acquire tokens."""
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client._rate_limit = 100.0
+        client._tokens = 0.0
+
+        threads = [threading.Thread(target=client._wait_if_throttled) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert not any(thread.is_alive() for thread in threads)
+
+    def test_http_cache_options_passed_to_cached_session(self, temp_cache_dir):
+        """Test that volatile queries expire sooner and refresh bypasses cache reads."""
+        fake_cached_session = type('FakeCachedSession', (requests.Session,), {})
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client.session = fake_cached_session()
+        client.session.get = Mock(return_value=self._response(200))
+        client.refresh_http_cache = True
+
+        with patch('src.openalex_client.CachedSession', fake_cached_session):
+            client.get_citations('W1')
+
+        kwargs = client.session.get.call_args.kwargs
+        assert kwargs['expire_after'] == client.VOLATILE_EXPIRE_AFTER
+        assert kwargs['force_refresh'] is True
+
+
 @pytest.mark.unit
 class TestResolveJournalIds:
     """Tests for journal name resolution."""
 
-    @patch.object(OpenAlexClient, 'find_source_by_name')
-    def test_resolve_multiple_journals(self, mock_find_source, temp_cache_dir):
+    @patch.object(OpenAlexClient, '_prefetch_sources')
+    @patch.object(OpenAlexClient, '_find_source_by_normalized')
+    def test_resolve_multiple_journals(self, mock_find_source, mock_prefetch, temp_cache_dir):
         """Test resolving multiple journal names."""
         mock_find_source.side_effect = [
             {'id': 'S1', 'display_name': 'Nature'},
@@ -251,7 +542,43 @@ class TestResolveJournalIds:
         assert 'S1' in result
         assert 'S2' in result
 
-    @patch.object(OpenAlexClient, 'find_source_by_name')
+    @patch.object(OpenAlexClient, '_find_source_by_normalized')
+    def test_resolve_normalizes_once(self, mock_find_source, temp_cache_dir):
+        """Test that resolution passes the precomputed cache key through."""
+        mock_find_source.return_value = {'id': 'S1', 'display_name': 'Nature'}
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        client.resolve_journal_ids(['  Nature '])
+
+        mock_find_source.assert_called_once_with('  Nature ', 'nature')
+
+    @patch.object(OpenAlexClient, '_make_request')
+    def test_resolve_batches_uncached_names(self, mock_request, temp_cache_dir):
+        """Test that uncached names are searched together in one request."""
+        mock_request.return_value = _json_response({
+            'results': [
+                {'id': 'https://openalex.org/S1', 'display_name': 'Nature'},
+                {'id': 'https://openalex.org/S9', 'display_name': 'Nature Communications'},
+                {'id': 'https://openalex.org/S2', 'display_name': 'Science'},
+            ]
+        })
+
+        client = OpenAlexClient(cache_dir=temp_cache_dir)
+        result = client.resolve_journal_ids(['Nature', 'Science'])
+
+        assert result == ['S1', 'S2']
+        assert mock_request.call_count == 1
+        assert mock_request.call_args.kwargs['params']['filter'] == 'display_name.search:Nature|Science'
+        assert 'nature communications' not in client.journal_cache
+
+    def test_norm_folds_unicode_variants(self):
+        """Test that composed and decomposed accents share a cache key."""
+        composed = 'Revue M\u00e9dicale'
+        decomposed = 'Revue Me\u0301dicale'
+
+        assert OpenAlexClient._norm(composed) == OpenAlexClient._norm(decomposed)
+
+    @patch.object(OpenAlexClient, '_find_source_by_normalized')
     def test_resolve_empty_list(self, mock_find_source, temp_cache_dir):
         """Test with empty journal list."""
         client = OpenAlexClient(cache_dir=temp_cache_dir)
@@ -0,0 +1,115 @@
+"""
+Pytest tests for ReviewedPapersManager.
+"""
+import pytest
+import json
+import os
+
+from src.reviewed_papers import ReviewedPapersManager
+
+
+@pytest.mark.unit
+class TestReviewedPapers:
+    """Tests for storing and querying reviewed papers."""
+
+    def test_mark_and_check_reviewed(self, temp_cache_dir):
+        """Test marking a paper as reviewed."""
+        manager = ReviewedPapersManager(cache_dir=temp_cache_dir)
+        manager.mark_as_reviewed('10.1234/a', {'title': 'Paper A'})
+
+        assert manager.is_reviewed('10.1234/a')
+        assert not manager.is_reviewed('10.1234/b')
+        assert manager.get_stats() == {'total_reviewed': 1}
+
+    def test_reviewed_papers_persist(self, temp_cache_dir):
+        """Test that reviewed papers survive a new manager instance."""
+        ReviewedPapersManager(cache_dir=temp_cache_dir).mark_as_reviewed('W1')
+
+        assert ReviewedPapersManager(cache_dir=temp_cache_dir).is_reviewed('W1')
+
+    def test_get_all_reviewed_most_recent_first(self, temp_cache_dir):
+        """Test that reviewed papers are listed newest first with their metadata."""
+        manager = ReviewedPapersManager(cache_dir=temp_cache_dir)
+        manager._conn.executemany(
+            "INSERT INTO reviewed VALUES (?, ?, ?)",
+            [
+                ('old', '2024-01-01T00:00:00', json.dumps({'title': 'Old'})),
+                ('new', '2024-06-01T00:00:00', json.dumps({'title': 'New'})),
+            ]
+        )
+
+        reviewed = manager.get_all_reviewed()
+
+        assert [paper['paper_id'] for paper in reviewed] == ['new', 'old']
+        assert reviewed[0]['title'] == 'New'
+        assert reviewed[0]['reviewed_date'] == '2024-06-01T00:00:00'
+
+    def test_get_reviewed_ids_many(self, temp_cache_dir):
+        """Test batch lookups past SQLite's bound-parameter limit."""
+        manager = ReviewedPapersManager(cache_dir=temp_cache_dir)
+        for i in range(0, 2500, 100):
+            manager.mark_as_reviewed(f'W{i}')
+
+        reviewed = manager.get_reviewed_ids([f'W{i}' for i in range(2500)])
+
+        assert reviewed == {f'W{i}' for i in range(0, 2500, 100)}
+
+    def test_paper_data_with_numpy_values(self, temp_cache_dir):
+        """Test that paper metadata holding NumPy scalars can be stored."""
+        np = pytest.importorskip('numpy')
+        manager = ReviewedPapersManager(cache_dir=temp_cache_dir)
+        manager.mark_as_reviewed('W1', {'score': np.float64(0.5), 'rank': np.int64(3)})
+
+        assert manager.get_all_reviewed()[0]['score'] == 0.5
+
+    def test_clear_all(self, temp_cache_dir):
+        """Test clearing all reviewed papers."""
+        manager = ReviewedPapersManager(cache_dir=temp_cache_dir)
+        manager.mark_as_reviewed('W1')
+        manager.clear_all()
+
+        assert not manager.is_reviewed('W1')
+
+
+@pytest.mark.unit
+class TestJsonMigration:
+    """Tests for importing the legacy reviewed_papers.json store."""
+
+    def test_migrates_json_store(self, temp_cache_dir):
+        """Test that an existing JSON store is imported and retired."""
+        storage_file = os.path.join(temp_cache_dir, 'reviewed_papers.json')
+        with open(storage_file, 'w') as f:
+            json.dump({
+                'W1': {'reviewed_date': '2024-01-01T00:00:00', 'paper_data': {'title': 'Paper'}}
+            }, f)
+
+        manager = ReviewedPapersManager(cache_dir=temp_cache_dir)
+
+        assert manager.is_reviewed('W1')
+        assert manager.get_all_reviewed()[0]['title'] == 'Paper'
+        assert not os.path.exists(storage_file)
+        assert os.path.exists(storage_file + '.migrated')
+
+    def test_corrupt_json_store_left_in_place(self, temp_cache_dir):
+        """Test that an unreadable JSON store is kept for the user to recover."""
+        storage_file = os.path.join(temp_cache_dir, 'reviewed_papers.json')
+        with open(storage_file, 'w') as f:
+            f.write('{not json')
+
+        manager = ReviewedPapersManager(cache_dir=temp_cache_dir)
+
+        assert manager.get_stats() == {'total_reviewed': 0}
+        assert os.path.exists(storage_file)
+        assert not os.path.exists(storage_file + '.migrated')
+
+    def test_non_object_json_store_left_in_place(self, temp_cache_dir):
+        """Test that a JSON store of the wrong shape does not break startup."""
+        storage_file = os.path.join(temp_cache_dir, 'reviewed_papers.json')
+        with open(storage_file, 'w') as f:
+            json.dump(['W1', 'W2'], f)
+
+        manager = ReviewedPapersManager(cache_dir=temp_cache_dir)
+        manager.mark_as_reviewed('W3')
+
+        assert manager.get_stats() == {'total_reviewed': 1}
+        assert os.path.exists(storage_file)
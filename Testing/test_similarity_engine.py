@@ -4,9 +4,10 @@ Pytest tests for SimilarityEngine.
 import pytest
 from unittest.mock import Mock, patch
 import numpy as np
+import torch
 import os
 
-from src.similarity_engine import SimilarityEngine
+from src.similarity_engine import SimilarityEngine, library_cache_exists
 
 
 @pytest.mark.unit
@@ -61,6 +62,36 @@ class TestModelLoading:
         # Should only load once
         assert mock_transformer.call_count == 1
 
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_preload_model(self, mock_transformer, temp_cache_dir):
+        """Test that a background preload is reused by load_model."""
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.preload_model()
+        engine.load_model()
+        engine._load_thread.join()
+
+        assert engine.model is mock_transformer.return_value
+        assert mock_transformer.call_count == 1
+
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_load_model_onnx_backend(self, mock_transformer, temp_cache_dir, monkeypatch):
+        """Test that EMBEDDING_BACKEND=onnx loads the ONNX model."""
+        monkeypatch.setenv('EMBEDDING_BACKEND', 'onnx')
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.load_model()
+
+        assert mock_transformer.call_args.kwargs['backend'] == 'onnx'
+
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_load_model_backend_kwarg(self, mock_transformer, temp_cache_dir):
+        """Test that the backend argument selects the quantized ONNX model."""
+        engine = SimilarityEngine(cache_dir=temp_cache_dir, backend='onnx-int8')
+        engine.load_model()
+
+        assert mock_transformer.call_args.kwargs['model_kwargs'] == {'file_name': 'onnx/model_qint8_avx512.onnx'}
+        # Cached embeddings are not shared across backends
+        assert engine._embedding_key('text') != SimilarityEngine(cache_dir=temp_cache_dir)._embedding_key('text')
+
 
 @pytest.mark.unit
 class TestBuildLibraryProfile:
@@ -106,6 +137,83 @@ class TestBuildLibraryProfile:
 
         # Should not encode again
         assert mock_model.encode.call_count == first_encode_count
+        assert isinstance(new_engine.library_embeddings, np.memmap)
+        assert new_engine.library_papers == papers
+
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_build_profile_library_change_encodes_only_new_papers(self, mock_transformer, temp_cache_dir):
+        """Test that a changed library rebuilds the profile from cached embeddings."""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.6, 0.8]])
+        mock_transformer.return_value = mock_model
+
+        papers = [{'title': 'First Paper'}]
+        SimilarityEngine(cache_dir=temp_cache_dir).build_library_profile(papers)
+
+        mock_model.encode.return_value = np.array([[1.0, 0.0]])
+        grown = papers + [{'title': 'Second Paper'}]
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.build_library_profile(grown)
+
+        assert engine.library_papers == grown
+        assert mock_model.encode.call_args.args[0] == ['second paper']
+        np.testing.assert_allclose(engine.library_embeddings, [[0.6, 0.8], [1.0, 0.0]], atol=1e-3)
+
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_build_profile_keeps_stale_cache_when_not_rebuilding(self, mock_transformer, temp_cache_dir):
+        """Test that a lazy load keeps the profile built by init instead of re-embedding."""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.6, 0.8]])
+        mock_transformer.return_value = mock_model
+
+        papers = [{'title': 'First Paper'}]
+        SimilarityEngine(cache_dir=temp_cache_dir).build_library_profile(papers)
+        encode_count = mock_model.encode.call_count
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.build_library_profile(papers + [{'title': 'Second Paper'}], rebuild_if_stale=False)
+
+        assert mock_model.encode.call_count == encode_count
+        assert engine.library_papers == papers
+        assert len(engine.library_embeddings) == 1
+
+    def test_build_profile_migrates_pickle_cache(self, temp_cache_dir):
+        """Test that a legacy pickled cache is converted to .npy/.json."""
+        import pickle
+        papers = [{'title': 'Test Paper', 'abstract': 'Test abstract'}]
+        legacy_file = os.path.join(temp_cache_dir, 'library_embeddings_all.pkl')
+        with open(legacy_file, 'wb') as f:
+            pickle.dump({'embeddings': np.array([[3.0, 4.0]]), 'papers': papers}, f)
+
+        # Status checks accept the legacy cache, so the migration is reachable
+        assert library_cache_exists(temp_cache_dir, 'all')
+        assert not library_cache_exists(temp_cache_dir, 'other')
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.build_library_profile(papers)
+
+        assert not os.path.exists(legacy_file)
+        assert library_cache_exists(temp_cache_dir, 'all')
+        assert os.path.exists(os.path.join(temp_cache_dir, 'library_embeddings_all.npy'))
+        assert engine.library_papers == papers
+        np.testing.assert_allclose(engine.library_embeddings, [[0.6, 0.8]], atol=1e-3)
+
+    def test_build_profile_normalizes_unflagged_cache_once(self, temp_cache_dir):
+        """Test that a cache without the normalized flag is normalized and resaved."""
+        import json
+        papers = [{'title': 'Test Paper'}]
+        np.save(os.path.join(temp_cache_dir, 'library_embeddings_all.npy'),
+                np.array([[3.0, 4.0]], dtype=np.float16))
+        papers_file = os.path.join(temp_cache_dir, 'library_papers_all.json')
+        with open(papers_file, 'w') as f:
+            json.dump(papers, f)
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.build_library_profile(papers)
+
+        np.testing.assert_allclose(engine.library_embeddings, [[0.6, 0.8]], atol=1e-3)
+        with open(papers_file) as f:
+            assert json.load(f) == {'normalized': True, 'papers': papers}
 
     def test_build_profile_no_valid_papers(self, temp_cache_dir):
         """Test error when no valid papers."""
@@ -170,6 +278,113 @@ class TestComputeSimilarity:
         assert isinstance(results[0]['similarity_score'], float)
         assert isinstance(results[0]['most_similar_paper']['similarity'], float)
 
+    def test_compute_similarity_blocks_candidates(self, temp_cache_dir, sample_library_papers):
+        """Test that candidates are scored in blocks with the same results."""
+        rng = np.random.default_rng(0)
+        candidate_emb = rng.standard_normal((5, 3))
+        mock_model = Mock()
+        mock_model.encode.return_value = candidate_emb
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.library_papers = sample_library_papers
+        engine.library_embeddings = np.eye(3)
+        engine.model = mock_model
+
+        with patch('src.similarity_engine._CANDIDATE_BLOCK_ROWS', 2), \
+                patch.object(engine, '_similarity_matrix', wraps=engine._similarity_matrix) as mock_scores:
+            results = engine.compute_similarity([{'title': f'Candidate {i}'} for i in range(5)])
+
+        assert mock_scores.call_count == 3
+        expected = (candidate_emb / np.linalg.norm(candidate_emb, axis=1, keepdims=True)).max(axis=1)
+        np.testing.assert_allclose([r['similarity_score'] for r in results], expected, atol=1e-3)
+
+    def test_compute_similarity_ranks_on_device(self, temp_cache_dir, sample_library_papers):
+        """Test that ranking on the model's device matches the host path."""
+        rng = np.random.default_rng(1)
+        candidate_emb = rng.standard_normal((4, 3))
+        mock_model = Mock()
+        mock_model.encode.return_value = candidate_emb
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.library_papers = sample_library_papers
+        engine.library_embeddings = np.eye(3, dtype=np.float16)
+        engine.model = mock_model
+        candidates = [{'title': f'Candidate {i}'} for i in range(4)]
+        expected = engine.compute_similarity([dict(c) for c in candidates])
+
+        # A CPU torch device stands in for CUDA
+        with patch.object(engine, '_cuda_device', return_value=torch.device('cpu')), \
+                patch.object(engine, '_similarity_matrix') as mock_host:
+            results = engine.compute_similarity([dict(c) for c in candidates])
+
+        mock_host.assert_not_called()
+        np.testing.assert_allclose([r['similarity_score'] for r in results],
+                                   [r['similarity_score'] for r in expected], atol=1e-3)
+        assert [r['most_similar_paper']['title'] for r in results] == \
+            [r['most_similar_paper']['title'] for r in expected]
+
+    def test_compute_similarity_uses_ann_index(self, temp_cache_dir, sample_library_papers):
+        """Test that an HNSW index, when present, replaces the exact scan."""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.0, 1.0, 0.0]])
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.library_papers = sample_library_papers
+        engine.library_embeddings = np.eye(3, dtype=np.float16)
+        engine.model = mock_model
+        mock_index = Mock()
+        mock_index.search.return_value = (np.array([[0.75]], dtype=np.float32), np.array([[2]]))
+        engine._ann_index = (engine.library_embeddings, mock_index)
+
+        with patch.object(engine, '_similarity_matrix') as mock_exact:
+            results = engine.compute_similarity([{'title': 'Candidate'}])
+
+        mock_exact.assert_not_called()
+        assert results[0]['similarity_score'] == 0.75
+        assert results[0]['most_similar_paper']['title'] == sample_library_papers[2]['title']
+
+    def test_compute_similarity_rescores_ann_misses(self, temp_cache_dir, sample_library_papers):
+        """Test that candidates the HNSW index found no neighbor for are scored exactly."""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.0, 1.0, 0.0], [1.0, 0.0, 0.0]])
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.library_papers = sample_library_papers
+        engine.library_embeddings = np.eye(3, dtype=np.float16)
+        engine.model = mock_model
+        mock_index = Mock()
+        mock_index.search.return_value = (
+            np.array([[0.75, 0.1, -3.4e38], [-3.4e38, -3.4e38, -3.4e38]], dtype=np.float32),
+            np.array([[2, 0, -1], [-1, -1, -1]])
+        )
+        engine._ann_index = (engine.library_embeddings, mock_index)
+
+        results = engine.compute_similarity([{'title': 'Candidate 1'}, {'title': 'Candidate 2'}])
+
+        assert [[r['title'], r['similarity']] for r in engine.get_most_similar_library_papers(results[0], top_k=2)] == \
+            [[sample_library_papers[2]['title'], 0.75], [sample_library_papers[0]['title'], pytest.approx(0.1)]]
+        assert results[1]['similarity_score'] == pytest.approx(1.0, abs=1e-3)
+        assert results[1]['most_similar_paper']['title'] == sample_library_papers[0]['title']
+
+    def test_ann_index_requires_opt_in(self, temp_cache_dir, monkeypatch):
+        """Test that an installed faiss is only used with SIMILARITY_INDEX=hnsw."""
+        monkeypatch.delenv('SIMILARITY_INDEX', raising=False)
+        index_file = os.path.join(temp_cache_dir, 'index.faiss')
+        with patch('src.similarity_engine.faiss') as mock_faiss, \
+                patch('src.similarity_engine._ANN_MIN_LIBRARY_SIZE', 1):
+            engine = SimilarityEngine(cache_dir=temp_cache_dir)
+            engine.library_embeddings = np.eye(3, dtype=np.float16)
+            engine._prepare_ann_index(index_file)
+            assert engine._ann_index is None
+            mock_faiss.IndexHNSWFlat.assert_not_called()
+
+            monkeypatch.setenv('SIMILARITY_INDEX', 'hnsw')
+            engine = SimilarityEngine(cache_dir=temp_cache_dir)
+            engine.library_embeddings = np.eye(3, dtype=np.float16)
+            mock_faiss.IndexHNSWFlat.return_value.ntotal = 3
+            engine._prepare_ann_index(index_file)
+            assert engine._ann_index is not None
+
     def test_compute_similarity_no_library(self, temp_cache_dir):
         """Test error when library not built."""
         engine = SimilarityEngine(cache_dir=temp_cache_dir)
@@ -210,6 +425,185 @@ class TestComputeSimilarity:
         assert len(results) == 1
 
 
+@pytest.mark.unit
+class TestEmbeddingCache:
+    """Tests for the persistent text embedding cache."""
+
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_encode_cached_reuses_embeddings(self, mock_transformer, temp_cache_dir):
+        """Test that cached texts are not re-encoded, even by a new engine."""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.6, 0.8], [1.0, 0.0]])
+        mock_transformer.return_value = mock_model
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        first = engine._encode_cached(['text a', 'text b', 'text a'])
+
+        assert mock_model.encode.call_count == 1
+        # Duplicate texts are encoded once and returned in input order
+        assert mock_model.encode.call_args.args[0] == ['text a', 'text b']
+        np.testing.assert_allclose(first[0], first[2])
+
+        new_engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        second = new_engine._encode_cached(['text b', 'text a'])
+
+        assert mock_model.encode.call_count == 1
+        assert new_engine.model is None  # Fully cached: model never loaded
+        np.testing.assert_allclose(second, first[[1, 0]], atol=1e-3)
+
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_encode_cached_canonicalizes_text(self, mock_transformer, temp_cache_dir):
+        """Test that texts differing only in case/whitespace share an embedding."""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.6, 0.8]])
+        mock_transformer.return_value = mock_model
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine._encode_cached(['Deep  Learning.\nAbstract', 'deep learning. abstract'])
+
+        assert mock_model.encode.call_args.args[0] == ['deep learning. abstract']
+
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_encode_cached_prunes_stale_candidates(self, mock_transformer, temp_cache_dir):
+        """Test that long-unused candidate rows are pruned but library rows are kept."""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[1.0, 0.0], [0.0, 1.0]])
+        mock_transformer.return_value = mock_model
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine._encode_cached(['library paper', 'candidate paper'], pin_first=1)
+        engine._emb_cache.execute("UPDATE cache SET last_used = 0 WHERE last_used IS NOT NULL")
+        engine._emb_cache.commit()
+
+        new_engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        mock_model.encode.return_value = np.array([[0.0, 1.0]])
+        new_engine._encode_cached(['library paper', 'candidate paper'])
+
+        # Only the pruned candidate is encoded again
+        assert mock_model.encode.call_args.args[0] == ['candidate paper']
+
+    @patch('src.similarity_engine.ProcessPoolExecutor')
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_encode_chunked_falls_back_in_process(self, mock_transformer, mock_pool, temp_cache_dir):
+        """Test that failing encode workers fall back to the in-process model."""
+        from concurrent.futures.process import BrokenProcessPool
+        mock_pool.side_effect = BrokenProcessPool('worker killed')
+        mock_model = Mock()
+        mock_model.encode.return_value = np.ones((600, 2))
+        mock_transformer.return_value = mock_model
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir, encode_processes=2)
+        with patch('src.similarity_engine.torch.cuda.is_available', return_value=False):
+            embeddings = engine._encode([f'text {i}' for i in range(600)])
+
+        assert mock_pool.call_count >= 1
+        assert mock_model.encode.call_count == 1
+        assert embeddings.shape == (600, 2)
+
+    @patch('src.similarity_engine.SentenceTransformer')
+    def test_encode_processes_skip_preload(self, mock_transformer, temp_cache_dir):
+        """Test that worker-process encoding neither preloads nor depends on the in-process model."""
+        engine = SimilarityEngine(cache_dir=temp_cache_dir, encode_processes=2)
+        engine.preload_model()
+        assert engine._load_thread is None
+
+        engine.model = Mock()  # e.g. loaded earlier for a small batch
+        with patch.object(engine, '_encode_chunked', return_value=np.ones((600, 2))) as mock_chunked, \
+                patch('src.similarity_engine.torch.cuda.is_available', return_value=False):
+            engine._encode([f'text {i}' for i in range(600)])
+
+        mock_chunked.assert_called_once()
+        engine.model.encode.assert_not_called()
+
+
+@pytest.mark.unit
+class TestSimilarityKernels:
+    """Tests for the similarity scoring kernels."""
+
+    def test_numba_kernel_matches_blas(self, temp_cache_dir, monkeypatch):
+        """Test that the Numba kernel gives the same scores as the BLAS path."""
+        pytest.importorskip('numba')
+        from src.similarity_engine import _cosine_scores
+
+        rng = np.random.default_rng(0)
+        library = rng.standard_normal((5, 4)).astype(np.float16)
+        queries = rng.standard_normal((3, 4)).astype(np.float32)
+
+        monkeypatch.setenv('SIMILARITY_KERNEL', 'numba')
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.library_embeddings = library
+
+        np.testing.assert_allclose(
+            engine._similarity_matrix(queries), _cosine_scores(queries, library), rtol=1e-5
+        )
+
+    @pytest.mark.parametrize('top_k', [1, 3, 8, 12])
+    def test_numba_rank_matches_argsort(self, top_k):
+        """Test that the Numba top-k ranking matches a stable argsort, including ties and k >= n."""
+        pytest.importorskip('numba')
+        from src.similarity_engine import _rank, _top_k_rows
+
+        rng = np.random.default_rng(0)
+        # Few distinct values, so most rows have ties across the top-k boundary
+        scores = rng.integers(0, 4, size=(6, 8)).astype(np.float32) / 4
+        scores[0] = rng.random(8, dtype=np.float32)
+
+        top_idx, top_scores = _rank(scores, top_k)
+
+        k = min(top_k, scores.shape[1])
+        expected_idx = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+        np.testing.assert_array_equal(top_idx, expected_idx)
+        np.testing.assert_array_equal(top_scores, np.take_along_axis(scores, expected_idx, axis=1))
+        np.testing.assert_array_equal(top_scores, _top_k_rows(scores, top_k)[1])
+
+    def test_simsimd_kernel_matches_blas(self, temp_cache_dir, monkeypatch):
+        """Test that the SimSIMD kernel gives the same scores as the BLAS path."""
+        pytest.importorskip('simsimd')
+        from src.similarity_engine import _cosine_scores, _l2_normalize
+
+        rng = np.random.default_rng(0)
+        library = _l2_normalize(rng.standard_normal((5, 4))).astype(np.float16)
+        queries = _l2_normalize(rng.standard_normal((3, 4)))
+
+        monkeypatch.setenv('SIMILARITY_KERNEL', 'simsimd')
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.library_embeddings = library
+
+        np.testing.assert_allclose(
+            engine._similarity_matrix(queries), _cosine_scores(queries, library), atol=1e-3
+        )
+
+    def test_simsimd_int8_kernel_matches_blas(self, temp_cache_dir, monkeypatch):
+        """Test that the SimSIMD int8 kernel stays within quantization error of the BLAS path."""
+        pytest.importorskip('simsimd')
+        from src.similarity_engine import _KERNELS, _cosine_scores, _l2_normalize, _quantize_int8
+
+        rng = np.random.default_rng(0)
+        library = _l2_normalize(rng.standard_normal((50, 384))).astype(np.float16)
+        queries = _l2_normalize(rng.standard_normal((10, 384)))
+
+        monkeypatch.setenv('SIMILARITY_KERNEL', 'simsimd-int8')
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.library_embeddings = library
+
+        assert _KERNELS[engine.similarity_kernel][0] is _quantize_int8
+        scores = engine._similarity_matrix(queries)
+        assert engine._library_prepared[2].dtype == np.int8
+        np.testing.assert_allclose(scores, _cosine_scores(queries, library), atol=2e-2)
+
+    def test_quantize_int8_preserves_cosine(self):
+        """Test that int8 quantization keeps cosine similarities close."""
+        from src.similarity_engine import _quantize_int8, _l2_normalize
+
+        rng = np.random.default_rng(0)
+        a, b = _l2_normalize(rng.standard_normal((2, 384)))
+        qa, qb = _quantize_int8(np.stack([a, b])).astype(np.float32)
+
+        assert _quantize_int8(np.stack([a, b])).dtype == np.int8
+        quantized = qa @ qb / (np.linalg.norm(qa) * np.linalg.norm(qb))
+        assert quantized == pytest.approx(float(a @ b), abs=1e-2)
+
+
 @pytest.mark.unit
 class TestGetMostSimilarPapers:
     """Tests for finding most similar library papers."""
@@ -248,4 +642,21 @@ class TestGetMostSimilarPapers:
         with pytest.raises(ValueError, match="Library profile not built"):
             engine.get_most_similar_library_papers({'title': 'Test'})
 
+    def test_get_most_similar_reuses_compute_similarity_matches(self, temp_cache_dir, sample_library_papers):
+        """Test that papers scored by compute_similarity are not re-encoded."""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.6, 0.8, 0.0]])
+
+        engine = SimilarityEngine(cache_dir=temp_cache_dir)
+        engine.library_embeddings = np.eye(3)
+        engine.library_papers = sample_library_papers
+        engine.model = mock_model
+
+        paper = engine.compute_similarity([{'title': 'Candidate'}])[0]
+        results = engine.get_most_similar_library_papers(paper, top_k=2)
 
+        assert mock_model.encode.call_count == 1
+        assert [r['title'] for r in results] == [sample_library_papers[1]['title'], sample_library_papers[0]['title']]
+        assert results[0]['similarity'] == pytest.approx(0.8, abs=1e-3)
+        # The stash stays on the engine, out of the returned paper
+        assert not any(key.startswith('_') for key in paper)
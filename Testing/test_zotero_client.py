@@ -247,6 +247,28 @@ class TestCollections:
         assert collections[1]['id'] == 'COL2'
         assert collections[1]['name'] == 'Research'
 
+    @patch.dict(os.environ, {
+        'ZOTERO_API_KEY': 'test_key',
+        'ZOTERO_USER_ID': 'test_user',
+        'ZOTERO_LIBRARY_TYPE': 'user'
+    })
+    @patch('src.zotero_client.zotero.Zotero')
+    def test_list_collections_uses_listed_counts(self, mock_zotero):
+        """Test that item counts in the listing avoid per-collection requests."""
+        mock_zot = Mock()
+        mock_zot.collections.return_value = [
+            {'data': {'key': 'COL1', 'name': 'My Papers'}, 'meta': {'numItems': 3}},
+            {'data': {'key': 'COL2', 'name': 'Research'}}
+        ]
+        mock_zot.num_collectionitems.return_value = 7
+        mock_zotero.return_value = mock_zot
+
+        client = ZoteroClient()
+        collections = client.list_collections()
+
+        assert [c['num_items'] for c in collections] == [3, 7]
+        mock_zot.num_collectionitems.assert_called_once_with('COL2')
+
     @patch.dict(os.environ, {
         'ZOTERO_API_KEY': 'test_key',
         'ZOTERO_USER_ID': 'test_user',
@@ -266,6 +288,7 @@ class TestCollections:
 
         client = ZoteroClient()
         result = client.find_collection_by_name('My Papers')
+        mock_zot.num_collectionitems.assert_not_called()
 
         assert result == 'COL1'
 
@@ -450,3 +473,74 @@ class TestFetchLibrary:
 
         assert len(items) == 1
         mock_zot.collection_items.assert_called_once_with('COL123', limit=None)
+
+    @patch.dict(os.environ, {
+        'ZOTERO_API_KEY': 'test_key',
+        'ZOTERO_USER_ID': 'test_user',
+        'ZOTERO_LIBRARY_TYPE': 'user'
+    })
+    @patch('src.zotero_client.zotero.Zotero')
+    def test_fetch_library_cached_by_version(self, mock_zotero, temp_cache_dir):
+        """Test that an unchanged library version skips the download."""
+        mock_zot = Mock()
+        mock_items = [{'data': {'itemType': 'journalArticle', 'title': 'Paper 1'}}]
+        mock_zot.everything.return_value = mock_items
+        mock_zot.last_modified_version.return_value = 42
+        mock_zot.library_id = 'test_user'
+        mock_zotero.return_value = mock_zot
+
+        client = ZoteroClient(cache_dir=temp_cache_dir)
+        first = client.fetch_library()
+        second = client.fetch_library()
+
+        assert second == first
+        assert mock_zot.everything.call_count == 1
+
+        # A new library version fetches again
+        mock_zot.last_modified_version.return_value = 43
+        client.fetch_library()
+        assert mock_zot.everything.call_count == 2
+
+    @patch.dict(os.environ, {
+        'ZOTERO_API_KEY': 'test_key',
+        'ZOTERO_USER_ID': 'test_user',
+        'ZOTERO_LIBRARY_TYPE': 'user'
+    })
+    @patch('src.zotero_client.zotero.Zotero')
+    def test_fetch_library_cache_keyed_by_library(self, mock_zotero, temp_cache_dir):
+        """Test that the version cache is not shared between libraries."""
+        mock_zot = Mock()
+        mock_zot.everything.return_value = [{'data': {'itemType': 'journalArticle', 'title': 'Paper 1'}}]
+        mock_zot.last_modified_version.return_value = 42
+        mock_zot.library_id = 'test_user'
+        mock_zotero.return_value = mock_zot
+
+        ZoteroClient(cache_dir=temp_cache_dir).fetch_library()
+        assert os.path.exists(os.path.join(temp_cache_dir, 'zotero_library_user_test_user_all.json'))
+
+        # Another library at the same version must fetch its own items
+        mock_zot.library_id = 'other_user'
+        ZoteroClient(cache_dir=temp_cache_dir).fetch_library()
+        assert mock_zot.everything.call_count == 2
+
+    @pytest.mark.parametrize('content', ['not json', '[1, 2]', '{"version": 42}'])
+    @patch.dict(os.environ, {
+        'ZOTERO_API_KEY': 'test_key',
+        'ZOTERO_USER_ID': 'test_user',
+        'ZOTERO_LIBRARY_TYPE': 'user'
+    })
+    @patch('src.zotero_client.zotero.Zotero')
+    def test_fetch_library_malformed_cache_is_a_miss(self, mock_zotero, temp_cache_dir, content):
+        """Test that a corrupt or wrongly shaped cache file is refetched instead of raising."""
+        mock_zot = Mock()
+        mock_zot.everything.return_value = [{'data': {'itemType': 'journalArticle', 'title': 'Paper 1'}}]
+        mock_zot.last_modified_version.return_value = 42
+        mock_zot.library_id = 'test_user'
+        mock_zotero.return_value = mock_zot
+        with open(os.path.join(temp_cache_dir, 'zotero_library_user_test_user_all.json'), 'w') as f:
+            f.write(content)
+
+        papers = ZoteroClient(cache_dir=temp_cache_dir).fetch_library()
+
+        assert [p['title'] for p in papers] == ['Paper 1']
+        assert mock_zot.everything.call_count == 1
@@ -11,6 +11,7 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 
 from src.recommender import PaperRecommender
+from src.similarity_engine import library_cache_exists
 from src.journal_lists import TOP_BIOLOGY_MEDICINE_JOURNALS, load_journals_from_file
 from src.reviewed_papers import ReviewedPapersManager
 from src.email_sender import EmailSender
@@ -50,7 +51,7 @@ def get_status():
     # Allow checking status for a specific collection via query param
     collection_id = request.args.get('collection_id') or os.getenv('ZOTERO_COLLECTION_ID') or 'all'
     collection_key = (''.join(c if c.isalnum() else '_' for c in collection_id.lower()).strip('_') or 'all')
-    embeddings_exist = os.path.exists(os.path.join(cache_dir, f"library_embeddings_{collection_key}.pkl"))
+    embeddings_exist = library_cache_exists(cache_dir, collection_key)
     citation_exist = os.path.exists(os.path.join(cache_dir, f"citation_network_{collection_key}.pkl"))
 
     return jsonify({
@@ -118,12 +119,11 @@ def get_recommendations():
         cache_dir = ".cache"
         raw_collection = os.getenv('ZOTERO_COLLECTION_ID') or 'all'
         collection_key = (''.join(c if c.isalnum() else '_' for c in raw_collection.lower()).strip('_') or 'all')
-        emb_path = os.path.join(cache_dir, f"library_embeddings_{collection_key}.pkl")
         cit_path = os.path.join(cache_dir, f"citation_network_{collection_key}.pkl")
 
         # Lazy-load from per-collection cache if needed
         if not is_initialized:
-            if not os.path.exists(emb_path):
+            if not library_cache_exists(cache_dir, collection_key):
                 return jsonify({
                     'success': False,
                     'error': 'System not initialized for this collection. Please initialize first.'
@@ -131,7 +131,7 @@ def get_recommendations():
 
             # Load from cache (engines will read per-collection files)
             recommender.library_papers = recommender.zotero.fetch_library()
-            recommender.similarity.build_library_profile(recommender.library_papers)
+            recommender.similarity.build_library_profile(recommender.library_papers, rebuild_if_stale=False)
             recommender.citation_scorer.build_library_network(
                 recommender.openalex,
                 recommender.library_papers
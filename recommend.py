@@ -10,6 +10,7 @@ import click
 from dotenv import load_dotenv
 
 from src.recommender import PaperRecommender
+from src.similarity_engine import library_cache_exists
 from src.journal_lists import load_journals_from_file
 
 
@@ -88,15 +89,14 @@ def recommend(days, top, citation_weight, similarity_weight, min_citation,
         cache_dir = ".cache"
         raw_collection = os.getenv("ZOTERO_COLLECTION_ID") or "all"
         collection_key = (''.join(c if c.isalnum() else '_' for c in raw_collection.lower()).strip('_') or "all")
-        emb_path = os.path.join(cache_dir, f"library_embeddings_{collection_key}.pkl")
-        if not os.path.exists(emb_path):
+        if not library_cache_exists(cache_dir, collection_key):
             click.echo("Error: Recommender not initialized for this collection. Run 'recommend.py init' first.", err=True)
             sys.exit(1)
 
         # Load from cache
         click.echo("Loading recommendation engine...")
         recommender.library_papers = recommender.zotero.fetch_library()
-        recommender.similarity.build_library_profile(recommender.library_papers)
+        recommender.similarity.build_library_profile(recommender.library_papers, rebuild_if_stale=False)
         recommender.citation_scorer.build_library_network(
             recommender.openalex,
             recommender.library_papers
@@ -217,13 +217,12 @@ def stats():
         cache_dir = ".cache"
         raw_collection = os.getenv("ZOTERO_COLLECTION_ID") or "all"
         collection_key = (''.join(c if c.isalnum() else '_' for c in raw_collection.lower()).strip('_') or "all")
-        emb_path = os.path.join(cache_dir, f"library_embeddings_{collection_key}.pkl")
-        if not os.path.exists(emb_path):
+        if not library_cache_exists(cache_dir, collection_key):
             click.echo("Error: Recommender not initialized for this collection. Run 'recommend.py init' first.", err=True)
             sys.exit(1)
 
         recommender.library_papers = recommender.zotero.fetch_library()
-        recommender.similarity.build_library_profile(recommender.library_papers)
+        recommender.similarity.build_library_profile(recommender.library_papers, rebuild_if_stale=False)
         recommender.citation_scorer.build_library_network(
             recommender.openalex,
             recommender.library_papers
@@ -295,6 +294,13 @@ def collections():
         sys.exit(1)
 
 
+def _remove_http_cache(cache_dir):
+    """Delete the OpenAlex HTTP response cache so cleared data is refetched."""
+    http_cache_file = os.path.join(cache_dir, "openalex_http.sqlite")
+    if os.path.exists(http_cache_file):
+        os.remove(http_cache_file)
+
+
 @cli.command()
 @click.option('--confirm', is_flag=True, help='Skip confirmation prompt')
 @click.option('--journals-only', is_flag=True, help='Clear only journal ID cache')
@@ -327,6 +333,7 @@ def clear_cache(confirm, journals_only, search_only):
 
         try:
             os.remove(search_cache_file)
+            _remove_http_cache(cache_dir)
             click.echo("\n✓ Search results cache cleared successfully!")
         except Exception as e:
             click.echo(f"Error clearing search results cache: {e}", err=True)
@@ -351,6 +358,7 @@ def clear_cache(confirm, journals_only, search_only):
 
         try:
             os.remove(journal_cache_file)
+            _remove_http_cache(cache_dir)
             click.echo("\n✓ Journal cache cleared successfully!")
         except Exception as e:
             click.echo(f"Error clearing journal cache: {e}", err=True)
@@ -413,14 +421,13 @@ def export_bibtex(output_file, days, top):
         cache_dir = ".cache"
         raw_collection = os.getenv("ZOTERO_COLLECTION_ID") or "all"
         collection_key = (''.join(c if c.isalnum() else '_' for c in raw_collection.lower()).strip('_') or "all")
-        emb_path = os.path.join(cache_dir, f"library_embeddings_{collection_key}.pkl")
-        if not os.path.exists(emb_path):
+        if not library_cache_exists(cache_dir, collection_key):
             click.echo("Error: Recommender not initialized for this collection. Run 'recommend.py init' first.", err=True)
             sys.exit(1)
 
         click.echo("Loading recommendation engine...")
         recommender.library_papers = recommender.zotero.fetch_library()
-        recommender.similarity.build_library_profile(recommender.library_papers)
+        recommender.similarity.build_library_profile(recommender.library_papers, rebuild_if_stale=False)
         recommender.citation_scorer.build_library_network(
             recommender.openalex,
             recommender.library_papers
@@ -118,6 +118,9 @@ class CitationScorer:
         # Thread-safe collections
         network_lock = threading.Lock()
         id_map_lock = threading.Lock()
+        # OpenAlex IDs whose citations were already requested in this build
+        # (several Zotero items can resolve to the same work)
+        edges_fetched = set()
 
         def process_paper(paper_tuple):
             """Process a single library paper (find in OpenAlex and get its citations)."""
@@ -150,6 +153,13 @@ class CitationScorer:
                         'year': paper.get('year', '')
                     }
 
+                    already_fetched = openalex_id in edges_fetched
+                    edges_fetched.add(openalex_id)
+
+                if already_fetched:
+                    print(f"  Found in OpenAlex: {openalex_id} (citations already fetched)")
+                    return (True, 0)
+
                 # Get citations (papers that cite this library paper)
                 print(f"  Found in OpenAlex: {openalex_id}")
                 citations = openalex_client.get_citations(openalex_id, limit=max_citations)
@@ -168,20 +178,33 @@ class CitationScorer:
                 print(f"  Not found in OpenAlex")
                 return (False, 0)
 
-        # Process papers in parallel
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all papers with their index
-            futures = {
-                executor.submit(process_paper, (i, paper)): i
-                for i, paper in enumerate(papers_to_process)
-            }
-
-            # Wait for completion (futures complete as they finish)
-            for future in as_completed(futures):
-                try:
-                    future.result()  # This will raise any exceptions from the worker
-                except Exception as e:
-                    print(f"Error processing paper: {e}")
+        # A forced rebuild must not reuse citation pages from the HTTP cache
+        refresh_before = getattr(openalex_client, 'refresh_http_cache', False)
+        openalex_client.refresh_http_cache = refresh_before or force_rebuild
+        try:
+            # Resolve DOIs in batches up front; the per-paper find_work_by_doi
+            # calls below are then served from the client's in-process DOI cache
+            dois = [paper['doi'] for paper in papers_to_process if paper.get('doi')]
+            if dois:
+                print(f"Resolving {len(dois)} DOIs in batches...")
+                openalex_client.find_works_by_dois(dois)
+
+            # Process papers in parallel
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Submit all papers with their index
+                futures = {
+                    executor.submit(process_paper, (i, paper)): i
+                    for i, paper in enumerate(papers_to_process)
+                }
+
+                # Wait for completion (futures complete as they finish)
+                for future in as_completed(futures):
+                    try:
+                        future.result()  # This will raise any exceptions from the worker
+                    except Exception as e:
+                        print(f"Error processing paper: {e}")
+        finally:
+            openalex_client.refresh_http_cache = refresh_before
 
         # Cache the network with build parameters
         print("Saving citation network to cache...")
@@ -4,17 +4,52 @@ OpenAlex API client for citation network and paper discovery.
 import os
 import time
 import pickle
+import itertools
+import random
 import threading
-from typing import List, Dict, Optional, Set
+import unicodedata
+from datetime import timedelta
+from typing import List, Dict, Iterator, Optional, Set
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # Fall back to requests' stdlib-based decoder
+    orjson = None
+
+try:
+    from requests_cache import CachedSession
+except ImportError:  # Fall back to an uncached session
+    CachedSession = None
+
+OPENALEX_ID_PREFIX = "https://openalex.org/"
+DOI_URL_PREFIX = "https://doi.org/"
+
 
 class OpenAlexClient:
     """Client for interacting with OpenAlex API."""
 
     BASE_URL = "https://api.openalex.org"
 
+    # Longest server-requested pause honored from a Retry-After header (seconds)
+    MAX_RETRY_AFTER = 60.0
+    # Extra attempts for a request answered with 429
+    MAX_RATE_LIMIT_RETRIES = 3
+
+    # HTTP cache lifetimes: citation lists and recent-paper searches change
+    # daily, while works, sources and DOI lookups are nearly static
+    HTTP_CACHE_EXPIRE_AFTER = timedelta(days=7)
+    VOLATILE_EXPIRE_AFTER = timedelta(hours=6)
+
+    # Fields consumed by _parse_work (open_access carries oa_url)
+    _WORK_SELECT = (
+        "id,doi,title,publication_date,publication_year,primary_location,"
+        "abstract_inverted_index,authorships,concepts,cited_by_count,open_access"
+    )
+
     def __init__(self, email: Optional[str] = None, cache_dir: str = ".cache"):
         """
         Initialize OpenAlex client.
@@ -25,20 +60,73 @@ class OpenAlexClient:
         """
         load_dotenv()
         self.email = email or os.getenv("OPENALEX_EMAIL")
-        self.session = requests.Session()
+        self.session = self._create_session(cache_dir)
+        # Size the connection pool for threaded fan-out (e.g. citation network
+        # workers) so connections stay alive instead of being re-established,
+        # and let urllib3 retry transient server errors with backoff. 429s are
+        # retried by _make_request so they go through the rate limiter.
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=40,
+            pool_block=False,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=False,  # Retry-After is honored (capped) by the limiter
+                raise_on_status=False  # Return the final response instead of raising
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.cache_dir = cache_dir
         self.journal_cache_file = os.path.join(cache_dir, "journal_id_cache.pkl")
         self.journal_cache = self._load_journal_cache()
-
-        # Rate limiting (10 req/sec is safe for polite pool)
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # seconds between requests
-        self.rate_limit_lock = threading.Lock()  # Thread-safe rate limiting
+        # When set, requests bypass HTTP cache reads and store fresh responses
+        self.refresh_http_cache = False
+
+        # In-process memoization for repeated lookups within a run
+        self._doi_cache: Dict[str, Optional[Dict]] = {}  # Cleaned DOI -> parsed work (None if not found)
+        self._source_name_cache: Dict[str, Optional[Dict]] = {}  # Raw name -> source
+
+        # Rate limiting: token bucket sized for the polite pool (10 req/sec).
+        # The refill rate adapts (AIMD) to 429s and x-ratelimit-* headers.
+        self.max_requests_per_second = 10
+        self._rate_limit = float(self.max_requests_per_second)  # Tokens per second
+        self._tokens = self._rate_limit  # Start with a full bucket
+        self._last_refill = time.monotonic()
+        self._throttled_until = 0.0  # Server-requested pause (Retry-After)
+        self._rate_cond = threading.Condition()  # Thread-safe rate limiting
 
         # Add email to headers for polite pool
         if self.email:
             self.session.headers.update({"User-Agent": f"mailto:{self.email}"})
 
+    def _create_session(self, cache_dir: str) -> requests.Session:
+        """
+        Create the HTTP session, backed by an on-disk cache when available.
+
+        With requests-cache installed, GET responses are stored in a SQLite
+        database under cache_dir for 7 days (or as long as Cache-Control
+        allows), so repeated DOI/work/source lookups across runs are served
+        from disk. Citation and recent-paper queries expire after 6 hours, and
+        refresh_http_cache forces fresh responses. Stale entries are reused
+        if OpenAlex is unreachable.
+        """
+        if CachedSession is None:
+            return requests.Session()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        return CachedSession(
+            cache_name=os.path.join(cache_dir, "openalex_http"),
+            backend="sqlite",
+            expire_after=self.HTTP_CACHE_EXPIRE_AFTER,
+            allowable_methods=["GET"],
+            stale_if_error=True,
+            cache_control=True
+        )
+
     def _load_journal_cache(self) -> Dict[str, Dict]:
         """
         Load journal name-to-ID cache from disk.
@@ -78,16 +166,86 @@ class OpenAlexClient:
             return None
 
         # Clean DOI
-        doi = doi.strip().replace("https://doi.org/", "")
+        doi = self._clean_doi(doi)
+
+        # Check in-process cache first
+        if doi.lower() in self._doi_cache:
+            return self._doi_cache[doi.lower()]
 
         url = f"{self.BASE_URL}/works/doi:{doi}"
-        response = self._make_request(url)
+        params = {"select": self._WORK_SELECT}
+        response = self._make_request(url, params=params)
 
         if response and response.status_code == 200:
-            return self._parse_work(response.json())
+            work = self._parse_work(self._json(response))
+            self._doi_cache[doi.lower()] = work
+            return work
 
         return None
 
+    def find_works_by_dois(self, dois: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Find many works in OpenAlex by DOI, batching up to 50 DOIs per request.
+
+        Resolved works, and DOIs a batch did not find, are also stored in the
+        in-process DOI cache, so later find_work_by_doi calls for the same
+        DOIs need no request.
+
+        Args:
+            dois: List of Digital Object Identifiers
+
+        Returns:
+            Dictionary mapping each canonical (cleaned, lowercase) DOI to its
+            work metadata, or None if not found, in input order
+        """
+        canonical = [self._clean_doi(doi).lower() for doi in dois if doi]
+        results = {doi: self._doi_cache.get(doi) for doi in canonical}
+
+        # '|' and ',' are filter syntax in OpenAlex, so such DOIs go one by one
+        to_fetch = [doi for doi in results
+                    if doi not in self._doi_cache and '|' not in doi and ',' not in doi]
+
+        url = f"{self.BASE_URL}/works"
+        batch_size = 50
+        for start in range(0, len(to_fetch), batch_size):
+            chunk = to_fetch[start:start + batch_size]
+            params = {
+                "filter": f"doi:{'|'.join(chunk)}",
+                # A DOI can match several works, so leave room beyond one per DOI
+                "per_page": 200,
+                "select": self._WORK_SELECT
+            }
+
+            response = self._make_request(url, params=params)
+            if not response or response.status_code != 200:
+                continue
+
+            data = self._json(response)
+            raw_works = data.get('results', [])
+            for raw_work in raw_works:
+                work = self._parse_work(raw_work)
+                doi = work['doi'].lower()
+                if doi in results:
+                    results[doi] = work
+                    self._doi_cache[doi] = work
+
+            # Remember misses so find_work_by_doi does not retry them one by
+            # one, but only when the page held the whole result set
+            if data.get('meta', {}).get('count', 0) <= len(raw_works):
+                for doi in chunk:
+                    self._doi_cache.setdefault(doi, None)
+
+        for doi, work in results.items():
+            if work is None and ('|' in doi or ',' in doi):
+                results[doi] = self.find_work_by_doi(doi)
+
+        return results
+
+    @staticmethod
+    def _clean_doi(doi: str) -> str:
+        """Strip whitespace and any https://doi.org/ prefix from a DOI."""
+        return doi.strip().removeprefix(DOI_URL_PREFIX)
+
     def find_work_by_title(self, title: str) -> Optional[Dict]:
         """
         Find a work in OpenAlex by title search.
@@ -104,13 +262,14 @@ class OpenAlexClient:
         url = f"{self.BASE_URL}/works"
         params = {
             "filter": f"title.search:{title}",
-            "per_page": 1
+            "per_page": 1,
+            "select": self._WORK_SELECT
         }
 
         response = self._make_request(url, params=params)
 
         if response and response.status_code == 200:
-            data = response.json()
+            data = self._json(response)
             results = data.get('results', [])
             if results:
                 return self._parse_work(results[0])
@@ -141,13 +300,13 @@ class OpenAlexClient:
             "cursor": "*"  # Start cursor pagination
         }
 
-        response = self._make_request(url, params=params)
+        response = self._make_request(url, params=params, expire_after=self.VOLATILE_EXPIRE_AFTER)
         if not response or response.status_code != 200:
             return []
 
-        data = response.json()
+        data = self._json(response)
         all_results = [
-            {'openalex_id': work.get('id', '').replace('https://openalex.org/', '')}
+            {'openalex_id': work.get('id', '').removeprefix(OPENALEX_ID_PREFIX)}
             for work in data.get('results', [])
         ]
 
@@ -160,12 +319,12 @@ class OpenAlexClient:
 
         while next_cursor and (limit is None or len(all_results) < limit):
             params['cursor'] = next_cursor
-            response = self._make_request(url, params=params)
+            response = self._make_request(url, params=params, expire_after=self.VOLATILE_EXPIRE_AFTER)
 
             if response and response.status_code == 200:
-                page_data = response.json()
+                page_data = self._json(response)
                 page_results = [
-                    {'openalex_id': work.get('id', '').replace('https://openalex.org/', '')}
+                    {'openalex_id': work.get('id', '').removeprefix(OPENALEX_ID_PREFIX)}
                     for work in page_data.get('results', [])
                 ]
                 all_results.extend(page_results)
@@ -203,10 +362,10 @@ class OpenAlexClient:
         response = self._make_request(url, params=params)
 
         if response and response.status_code == 200:
-            data = response.json()
+            data = self._json(response)
             # Return minimal dicts with just openalex_id (no need for full parsing)
             return [
-                {'openalex_id': work.get('id', '').replace('https://openalex.org/', '')}
+                {'openalex_id': work.get('id', '').removeprefix(OPENALEX_ID_PREFIX)}
                 for work in data.get('results', [])
             ]
 
@@ -226,12 +385,38 @@ class OpenAlexClient:
         if not source_name:
             return None
 
-        # Normalize name for cache lookup
-        normalized_name = source_name.lower().strip()
+        # Repeated lookups of the exact same string skip normalization
+        if source_name in self._source_name_cache:
+            return self._source_name_cache[source_name]
 
+        return self._find_source_by_normalized(source_name, self._norm(source_name))
+
+    @staticmethod
+    def _norm(name: str) -> str:
+        """
+        Normalize a journal name into its cache key.
+
+        NFKC folds compatibility characters (ligatures, full-width forms,
+        composed vs decomposed accents) so variants share one cache entry.
+        """
+        return unicodedata.normalize('NFKC', name).lower().strip()
+
+    def _find_source_by_normalized(self, source_name: str, normalized_name: str) -> Optional[Dict]:
+        """
+        Find a source by name given its precomputed normalized cache key.
+
+        Args:
+            source_name: Name of journal/source, as used for the API search
+            normalized_name: Cache key from _norm(source_name)
+
+        Returns:
+            Source metadata or None if not found
+        """
         # Check cache first
         if normalized_name in self.journal_cache:
-            return self.journal_cache[normalized_name]
+            source_data = self.journal_cache[normalized_name]
+            self._source_name_cache[source_name] = source_data
+            return source_data
 
         # Not in cache, fetch from API
         url = f"{self.BASE_URL}/sources"
@@ -243,30 +428,80 @@ class OpenAlexClient:
         response = self._make_request(url, params=params)
 
         if response and response.status_code == 200:
-            data = response.json()
+            data = self._json(response)
             results = data.get('results', [])
             if results:
-                source = results[0]
-                source_data = {
-                    'id': source.get('id', '').replace('https://openalex.org/', ''),
-                    'display_name': source.get('display_name', ''),
-                    'issn_l': source.get('issn_l', ''),
-                    'issn': source.get('issn', []),
-                    'type': source.get('type', '')
-                }
+                source_data = self._parse_source(results[0])
 
                 # Cache the result
                 self.journal_cache[normalized_name] = source_data
+                self._source_name_cache[source_name] = source_data
                 self._save_journal_cache()
 
                 return source_data
 
-        # Cache negative result to avoid repeated failed lookups
-        self.journal_cache[normalized_name] = None
-        self._save_journal_cache()
+            # Cache negative result to avoid repeated failed lookups; request
+            # errors are not cached, so the name is retried on the next run
+            self.journal_cache[normalized_name] = None
+            self._source_name_cache[source_name] = None
+            self._save_journal_cache()
 
         return None
 
+    def _parse_source(self, source: Dict) -> Dict:
+        """Parse OpenAlex source into the cached journal metadata format."""
+        return {
+            'id': source.get('id', '').removeprefix(OPENALEX_ID_PREFIX),
+            'display_name': source.get('display_name', ''),
+            'issn_l': source.get('issn_l', ''),
+            'issn': source.get('issn', []),
+            'type': source.get('type', '')
+        }
+
+    def _prefetch_sources(self, names: Dict[str, str], batch_size: int = 25):
+        """
+        Resolve uncached journal names in batches with OR-ed search filters.
+
+        Each request searches up to batch_size names at once; any returned
+        source whose normalized display name equals a requested key is cached.
+        Names without an exact match are left for the regular one-by-one
+        lookup, which keeps its best-match behavior.
+
+        Args:
+            names: Mapping of normalized cache key -> journal name
+            batch_size: Names per request
+        """
+        # '|' and ',' are filter syntax in OpenAlex, so such names go one by one
+        pending = [
+            (key, name) for key, name in names.items()
+            if key not in self.journal_cache and '|' not in name and ',' not in name
+        ]
+        if len(pending) < 2:
+            return
+
+        url = f"{self.BASE_URL}/sources"
+        resolved = 0
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            wanted = {key for key, _ in chunk}
+            params = {
+                "filter": f"display_name.search:{'|'.join(name for _, name in chunk)}",
+                "per_page": 200
+            }
+
+            response = self._make_request(url, params=params)
+            if not response or response.status_code != 200:
+                continue
+
+            for source in self._json(response).get('results', []):
+                key = self._norm(source.get('display_name') or '')
+                if key in wanted and key not in self.journal_cache:
+                    self.journal_cache[key] = self._parse_source(source)
+                    resolved += 1
+
+        if resolved:
+            self._save_journal_cache()
+
     def resolve_journal_ids(self, journal_names: List[str]) -> List[str]:
         """
         Resolve journal names to OpenAlex source IDs.
@@ -282,11 +517,16 @@ class OpenAlexClient:
         cache_hits = 0
         api_calls = 0
 
-        for name in journal_names:
-            normalized_name = name.lower().strip()
-            was_cached = normalized_name in self.journal_cache
+        names = {self._norm(name): name for name in journal_names if name}
+        previously_cached = {key for key in names if key in self.journal_cache}
+
+        # Batch-resolve uncached names before falling back to single lookups
+        self._prefetch_sources(names)
 
-            source = self.find_source_by_name(name)
+        for normalized_name, name in names.items():
+            was_cached = normalized_name in previously_cached
+
+            source = self._find_source_by_normalized(name, normalized_name)
 
             if source:
                 source_ids.append(source['id'])
@@ -306,20 +546,21 @@ class OpenAlexClient:
 
         return source_ids
 
-    def search_recent_papers(self, from_date: str,
-                            journal_ids: Optional[List[str]] = None,
-                            limit: int = 100) -> List[Dict]:
+    def iter_recent_papers(self, from_date: str,
+                           journal_ids: Optional[List[str]] = None) -> Iterator[Dict]:
         """
-        Search for recent papers, optionally filtered by journals.
-        Fetches ALL available papers using pagination (not limited to 200).
+        Lazily yield recent papers, optionally filtered by journals.
+
+        Pages are fetched via cursor pagination only as the caller consumes
+        them, and each page's raw works are parsed and released before the
+        next page is requested.
 
         Args:
             from_date: Date in YYYY-MM-DD format
             journal_ids: List of OpenAlex source IDs to filter by
-            limit: Maximum number of papers to retrieve (None = all available)
 
-        Returns:
-            List of recent works
+        Yields:
+            Parsed recent works, newest first
         """
         url = f"{self.BASE_URL}/works"
 
@@ -334,56 +575,65 @@ class OpenAlexClient:
         print(f"  Filters: {', '.join(filters)}")
         print(f"  Sort: publication_date:desc")
 
-        # First request using cursor pagination (supports >10,000 results)
+        # Cursor pagination (supports >10,000 results)
         params = {
             "filter": ",".join(filters),
             "sort": "publication_date:desc",
             "per_page": 200,  # Max per page
-            "cursor": "*"  # Start cursor pagination
+            "select": self._WORK_SELECT  # Only fields used by _parse_work
         }
 
-        response = self._make_request(url, params=params)
-        if not response or response.status_code != 200:
-            return []
-
-        data = response.json()
-        total_results = data.get('meta', {}).get('count', 0)
-        all_results = data.get('results', [])
-
-        print(f"  Total papers available in OpenAlex: {total_results}")
-        print(f"  Fetching papers via cursor pagination (supports >10,000 results)...")
-
-        # Get next cursor from response
-        next_cursor = data.get('meta', {}).get('next_cursor')
-        page_count = 1
+        next_cursor = "*"  # Start cursor pagination
+        page_count = 0
+        fetched = 0
 
-        # Continue fetching while cursor exists and we haven't hit limit
-        while next_cursor and (limit is None or len(all_results) < limit):
+        while next_cursor:
             params['cursor'] = next_cursor
-            response = self._make_request(url, params=params)
+            response = self._make_request(url, params=params, expire_after=self.VOLATILE_EXPIRE_AFTER)
+
+            if not response or response.status_code != 200:
+                if page_count:
+                    print(f"  Error fetching page {page_count + 1}, stopping pagination")
+                return
+
+            page_data = self._json(response)
+            page_results = page_data.get('results', [])
+            next_cursor = page_data.get('meta', {}).get('next_cursor')
+            page_count += 1
+            fetched += len(page_results)
+
+            if page_count == 1:
+                print(f"  Total papers available in OpenAlex: {page_data.get('meta', {}).get('count', 0)}")
+                print(f"  Fetching papers via cursor pagination (supports >10,000 results)...")
+            else:
+                print(f"  Fetched page {page_count} ({len(page_results)} papers, total: {fetched})")
 
-            if response and response.status_code == 200:
-                page_data = response.json()
-                page_results = page_data.get('results', [])
-                all_results.extend(page_results)
-                next_cursor = page_data.get('meta', {}).get('next_cursor')
-                page_count += 1
+            # Drop the page's raw JSON before handing parsed works downstream
+            del page_data
+            for work in page_results:
+                yield self._parse_work(work)
+            del page_results
+            # Rate limiting handled by _make_request()
 
-                print(f"  Fetched page {page_count} ({len(page_results)} papers, total: {len(all_results)})")
-                # Rate limiting handled by _make_request()
-            else:
-                print(f"  Error fetching page {page_count}, stopping pagination")
-                break
+    def search_recent_papers(self, from_date: str,
+                            journal_ids: Optional[List[str]] = None,
+                            limit: int = 100) -> List[Dict]:
+        """
+        Search for recent papers, optionally filtered by journals.
+        Fetches ALL available papers using pagination (not limited to 200).
 
-        print(f"  Total papers fetched: {len(all_results)}")
+        Args:
+            from_date: Date in YYYY-MM-DD format
+            journal_ids: List of OpenAlex source IDs to filter by
+            limit: Maximum number of papers to retrieve (None = all available)
 
-        # Parse and return
-        parsed_results = [self._parse_work(work) for work in all_results]
+        Returns:
+            List of recent works
+        """
+        papers = self.iter_recent_papers(from_date, journal_ids=journal_ids)
+        parsed_results = list(itertools.islice(papers, limit))
 
-        # Apply limit if specified
-        if limit:
-            parsed_results = parsed_results[:limit]
-            print(f"  Limiting to {len(parsed_results)} papers")
+        print(f"  Total papers fetched: {len(parsed_results)}")
 
         return parsed_results
 
@@ -397,37 +647,41 @@ class OpenAlexClient:
         Returns:
             Standardized work dictionary
         """
+        get = work.get
+
         # Extract journal/source information
-        primary_location = work.get('primary_location', {})
-        source = primary_location.get('source', {}) if primary_location else {}
-        journal = source.get('display_name', '') if source else ''
+        source = (get('primary_location') or {}).get('source') or {}
+        journal = source.get('display_name', '')
+
+        work_id = get('id') or ''
+        open_access = get('open_access') or {}
 
         return {
-            'openalex_id': work.get('id', '').replace('https://openalex.org/', ''),
-            'title': work.get('title', ''),
-            'doi': work.get('doi', '').replace('https://doi.org/', '') if work.get('doi') else '',
-            'publication_date': work.get('publication_date', ''),
-            'publication_year': work.get('publication_year'),
+            'openalex_id': work_id.removeprefix(OPENALEX_ID_PREFIX),
+            'title': get('title', ''),
+            'doi': (get('doi') or '').removeprefix(DOI_URL_PREFIX),
+            'publication_date': get('publication_date', ''),
+            'publication_year': get('publication_year'),
             'journal': journal,
             'abstract': self._get_abstract(work),
             'authors': [
                 {
-                    'name': author.get('author', {}).get('display_name', ''),
-                    'id': author.get('author', {}).get('id', '')
+                    'name': author.get('display_name', ''),
+                    'id': author.get('id', '')
                 }
-                for author in work.get('authorships', [])
+                for author in ((a.get('author') or {}) for a in get('authorships', []))
             ],
             'concepts': [
                 {
                     'name': concept.get('display_name', ''),
                     'score': concept.get('score', 0)
                 }
-                for concept in work.get('concepts', [])
+                for concept in get('concepts', [])
             ],
-            'cited_by_count': work.get('cited_by_count', 0),
-            'url': work.get('id', ''),
-            'open_access': work.get('open_access', {}).get('is_oa', False),
-            'pdf_url': work.get('open_access', {}).get('oa_url'),
+            'cited_by_count': get('cited_by_count', 0),
+            'url': work_id,
+            'open_access': open_access.get('is_oa', False),
+            'pdf_url': open_access.get('oa_url'),
         }
 
     def _get_abstract(self, work: Dict) -> str:
@@ -437,58 +691,138 @@ class OpenAlexClient:
         if not abstract_inverted:
             return ''
 
-        # Reconstruct abstract from inverted index
-        words = {}
+        # Reconstruct abstract from inverted index. Positions form a (nearly)
+        # dense range, so index straight into a list instead of sorting keys.
+        size = max((max(positions) for positions in abstract_inverted.values() if positions),
+                   default=-1) + 1
+        words = [None] * size
         for word, positions in abstract_inverted.items():
             for pos in positions:
                 words[pos] = word
 
-        return ' '.join(words[pos] for pos in sorted(words.keys()))
+        return ' '.join(word for word in words if word is not None)
+
+    def _json(self, response: requests.Response):
+        """Decode a JSON response body, using orjson when available."""
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+
+    def _refill_tokens(self, now: float):
+        """Add tokens accrued since the last refill, capped at one second's worth."""
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self._rate_limit, self._tokens + elapsed * self._rate_limit)
+
+    def _wait_if_throttled(self):
+        """
+        Block until a token is available in the rate-limit bucket.
 
-    def _make_request(self, url: str, params: Optional[Dict] = None, max_retries: int = 3) -> Optional[requests.Response]:
+        Waiting happens on a condition variable, which releases the lock, so
+        threads only serialize on the token arithmetic and never on sleeps.
+        A small random jitter after taking a token decorrelates bursts from
+        threads that were woken together.
+        """
+        with self._rate_cond:
+            while True:
+                now = time.monotonic()
+                if self._throttled_until > now:
+                    self._rate_cond.wait(self._throttled_until - now)
+                    continue
+
+                self._refill_tokens(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                self._rate_cond.wait((1 - self._tokens) / self._rate_limit)
+
+        time.sleep(random.uniform(0, 0.01))
+
+    def _update_rate_limit(self, response: requests.Response):
         """
-        Make HTTP request with rate limiting, retry logic, and error handling.
+        Adapt the request rate from OpenAlex rate-limit response headers.
+
+        A 429 halves the allowed rate (multiplicative decrease); any other
+        response nudges it back up towards the polite-pool maximum (additive
+        increase). Retry-After (capped at MAX_RETRY_AFTER), or an exhausted
+        remaining budget or a 429 without Retry-After, pauses all threads for
+        the indicated time.
+        """
+        headers = response.headers
+        retry_after = headers.get('retry-after')
+        remaining = headers.get('x-ratelimit-remaining-requests')
+
+        with self._rate_cond:
+            self._refill_tokens(time.monotonic())
+
+            # Responses served from the HTTP cache never reached OpenAlex:
+            # refund the token and leave the rate untouched
+            if getattr(response, 'from_cache', False):
+                self._tokens = min(self._rate_limit, self._tokens + 1)
+                self._rate_cond.notify_all()
+                return
+
+            if response.status_code == 429:
+                self._rate_limit = max(1.0, self._rate_limit * 0.5)
+            else:
+                self._rate_limit = min(float(self.max_requests_per_second), self._rate_limit + 0.5)
+
+            pause = None
+            if retry_after is not None:
+                try:
+                    pause = min(float(retry_after), self.MAX_RETRY_AFTER)
+                except ValueError:
+                    pause = None
+            elif response.status_code == 429 or (remaining is not None and remaining.strip() == '0'):
+                pause = 1.0
+
+            if pause:
+                self._throttled_until = max(self._throttled_until, time.monotonic() + pause)
+
+            # Let waiting threads re-evaluate against the new rate
+            self._rate_cond.notify_all()
+
+    def _make_request(self, url: str, params: Optional[Dict] = None,
+                      expire_after: Optional[timedelta] = None) -> Optional[requests.Response]:
+        """
+        Make HTTP request with rate limiting and error handling.
+
+        Retries with backoff on 5xx are handled by the session's mounted
+        HTTPAdapter. A 429 is retried here, up to MAX_RATE_LIMIT_RETRIES
+        times, after the rate limiter has backed off.
 
         Args:
             url: Request URL
             params: Query parameters
-            max_retries: Maximum number of retries for rate limit errors
+            expire_after: HTTP cache lifetime for this response (default:
+                HTTP_CACHE_EXPIRE_AFTER)
 
         Returns:
             Response object or None on error
         """
-        for attempt in range(max_retries):
-            # Rate limiting: ensure minimum time between requests (thread-safe)
-            with self.rate_limit_lock:
-                elapsed = time.time() - self.last_request_time
-                if elapsed < self.min_request_interval:
-                    time.sleep(self.min_request_interval - elapsed)
+        cache_kwargs = {}
+        if CachedSession is not None and isinstance(self.session, CachedSession):
+            if expire_after is not None:
+                cache_kwargs['expire_after'] = expire_after
+            if self.refresh_http_cache:
+                cache_kwargs['force_refresh'] = True
 
-            try:
-                response = self.session.get(url, params=params, timeout=30)
-                response.raise_for_status()
-
-                # Update last request time AFTER successful request
-                with self.rate_limit_lock:
-                    self.last_request_time = time.time()
-
-                return response
-            except requests.exceptions.HTTPError as e:
-                # Handle 429 (Too Many Requests) with exponential backoff
-                if e.response.status_code == 429:
-                    if attempt < max_retries - 1:
-                        wait_time = (2 ** attempt)  # 1s, 2s, 4s
-                        print(f"Rate limit hit (429). Retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"Rate limit hit (429). Max retries exceeded.")
-                        return None
-                else:
-                    print(f"HTTP error making request to {url}: {e}")
-                    return None
-            except requests.exceptions.RequestException as e:
-                print(f"Error making request to {url}: {e}")
-                return None
-
-        return None
+        try:
+            for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                # Rate limiting: take a token from the bucket (thread-safe)
+                self._wait_if_throttled()
+                response = self.session.get(url, params=params, timeout=30, **cache_kwargs)
+                self._update_rate_limit(response)
+                if response.status_code != 429:
+                    break
+            response.raise_for_status()
+            return response
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 429:
+                print(f"Rate limit hit (429). Max retries exceeded.")
+            else:
+                print(f"HTTP error making request to {url}: {e}")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"Error making request to {url}: {e}")
+            return None
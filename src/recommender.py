@@ -1,6 +1,7 @@
 """
 Main recommendation engine that combines citation and content similarity.
 """
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import numpy as np
@@ -29,7 +30,7 @@ class PaperRecommender:
             openalex_email: Email for OpenAlex polite pool
             cache_dir: Cache directory
         """
-        self.zotero = ZoteroClient(zotero_api_key, zotero_user_id)
+        self.zotero = ZoteroClient(zotero_api_key, zotero_user_id, cache_dir=cache_dir)
         self.openalex = OpenAlexClient(openalex_email)
 
         # Determine collection key for namespacing caches
@@ -105,15 +106,11 @@ class PaperRecommender:
 
         from collections import Counter
 
-        # Extract journals
-        journals = []
-        for paper in self.library_papers:
-            pub = paper.get('publication')
-            if pub and pub.strip():
-                journals.append(pub.strip())
-
-        # Count and rank
-        journal_counts = Counter(journals)
+        # Count journals in a single pass and rank
+        journal_counts = Counter(
+            pub for paper in self.library_papers
+            if (pub := (paper.get('publication') or '').strip())
+        )
         top_journals = [journal for journal, _ in journal_counts.most_common(top_n)]
 
         return top_journals
@@ -177,6 +174,10 @@ class PaperRecommender:
         print(f"  Date filter: from {from_date} onwards")
         print(f"  Journal filter: {len(journal_ids) if journal_ids else 0} journals")
 
+        # Network-bound search and CPU-bound model loading overlap: the
+        # embedding model loads in a background thread while pages download.
+        # compute_similarity waits for it (and surfaces loading errors)
+        self.similarity.preload_model()
         candidate_papers = self.openalex.search_recent_papers(
             from_date=from_date,
             journal_ids=journal_ids,  # Apply journal filter if available
@@ -197,54 +198,58 @@ class PaperRecommender:
             print("No candidate papers found.")
             return []
 
-        # Compute similarity scores
-        print("\nComputing content similarity scores...")
-        candidate_papers = self.similarity.compute_similarity(candidate_papers)
+        # Compute similarity and citation scores concurrently. Each scorer
+        # writes its own fields on the shared paper dicts, so they don't race
+        print("\nComputing content similarity and citation network scores...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            similarity_future = executor.submit(self.similarity.compute_similarity, candidate_papers)
+            citation_future = executor.submit(self.citation_scorer.compute_citation_scores, candidate_papers)
+            citation_future.result()
+            # Similarity scoring drops papers without text; keep its list
+            candidate_papers = similarity_future.result()
 
         # Show similarity score distribution
         sim_scores = [p.get('similarity_score', 0) for p in candidate_papers]
         if sim_scores:
             print(f"  Similarity scores - min: {min(sim_scores):.3f}, max: {max(sim_scores):.3f}, avg: {sum(sim_scores)/len(sim_scores):.3f}")
 
-        # Compute citation scores
-        print("\nComputing citation network scores...")
-        candidate_papers = self.citation_scorer.compute_citation_scores(candidate_papers)
-
         # Show citation score distribution
         cit_scores = [p.get('citation_score', 0) for p in candidate_papers]
         if cit_scores:
             print(f"  Citation scores - min: {min(cit_scores):.3f}, max: {max(cit_scores):.3f}, avg: {sum(cit_scores)/len(cit_scores):.3f}")
 
-        # Filter and rank
+        # Filter and rank in one vectorized pass over all candidates
         print("\nRanking papers...")
-        recommendations = []
-
-        for paper in candidate_papers:
-            citation_score = paper.get('citation_score', 0)
-            similarity_score = paper.get('similarity_score', 0)
-
-            # Apply thresholds
-            if citation_score < min_citation_score or similarity_score < min_similarity_score:
-                continue
+        n = len(candidate_papers)
+        similarity_scores = np.fromiter(
+            (p.get('similarity_score', 0.0) for p in candidate_papers), dtype=np.float64, count=n
+        )
+        citation_scores = np.fromiter(
+            (p.get('citation_score', 0.0) for p in candidate_papers), dtype=np.float64, count=n
+        )
+        combined_scores = citation_weight * citation_scores + similarity_weight * similarity_scores
 
-            # Filter out reviewed papers
-            # Use DOI as primary identifier, fallback to OpenAlex ID
-            paper_id = paper.get('doi') or paper.get('openalex_id')
-            if paper_id and self.reviewed_manager.is_reviewed(paper_id):
-                continue
+        # Apply thresholds
+        keep = (citation_scores >= min_citation_score) & (similarity_scores >= min_similarity_score)
 
-            # Compute combined score
-            combined_score = (
-                citation_weight * citation_score +
-                similarity_weight * similarity_score
-            )
+        # Filter out reviewed papers with a single lookup
+        # Use DOI as primary identifier, fallback to OpenAlex ID
+        paper_ids = [p.get('doi') or p.get('openalex_id') for p in candidate_papers]
+        reviewed = self.reviewed_manager.get_reviewed_ids(
+            [paper_id for paper_id, kept in zip(paper_ids, keep) if paper_id and kept]
+        )
+        if reviewed:
+            keep &= ~np.fromiter((paper_id in reviewed for paper_id in paper_ids), dtype=bool, count=n)
 
-            paper['combined_score'] = combined_score
+        # Sort by combined score (stable, so ties keep search order)
+        kept = np.flatnonzero(keep)
+        order = kept[np.argsort(-combined_scores[kept], kind='stable')]
+        recommendations = []
+        for i in order:
+            paper = candidate_papers[i]
+            paper['combined_score'] = float(combined_scores[i])
             recommendations.append(paper)
 
-        # Sort by combined score
-        recommendations.sort(key=lambda x: x['combined_score'], reverse=True)
-
         print(f"\nBefore limit: {len(recommendations)} papers passed filters")
         print(f"  Min thresholds - citation: {min_citation_score}, similarity: {min_similarity_score}")
 
@@ -3,8 +3,30 @@ Storage and management for reviewed papers.
 """
 import os
 import json
+import sqlite3
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib json module
+    orjson = None
+
+
+def _dumps(obj) -> str:
+    """Serialize to a JSON string, using orjson when available."""
+    if orjson is not None:
+        # NumPy scores (e.g. numpy.float64) serialize as plain numbers
+        return orjson.dumps(obj, default=float, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(obj, default=float)
+
+
+def _loads(data: str):
+    """Parse a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 class ReviewedPapersManager:
@@ -15,28 +37,56 @@ class ReviewedPapersManager:
         Initialize reviewed papers manager.
 
         Args:
-            cache_dir: Directory for storing reviewed papers JSON
+            cache_dir: Directory for storing the reviewed papers database
         """
         self.cache_dir = cache_dir
+        self.db_file = os.path.join(cache_dir, "reviewed.db")
+        # Legacy JSON store, imported into the database on first use
         self.storage_file = os.path.join(cache_dir, "reviewed_papers.json")
         os.makedirs(cache_dir, exist_ok=True)
 
-    def _load_reviewed_papers(self) -> Dict:
-        """Load reviewed papers from JSON file."""
+        # Autocommit connection shared across web request threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_file, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reviewed ("
+            "paper_id TEXT PRIMARY KEY, reviewed_date TEXT, paper_data TEXT)"
+        )
+        self._migrate_json_store()
+
+    def _migrate_json_store(self):
+        """Import papers from the legacy reviewed_papers.json, then retire the file."""
         if not os.path.exists(self.storage_file):
-            return {}
+            return
 
         try:
-            with open(self.storage_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            # If file is corrupted, return empty dict
-            return {}
-
-    def _save_reviewed_papers(self, reviewed_papers: Dict):
-        """Save reviewed papers to JSON file."""
-        with open(self.storage_file, 'w') as f:
-            json.dump(reviewed_papers, f, indent=2)
+            with open(self.storage_file, 'rb') as f:
+                reviewed_papers = _loads(f.read())
+            if not isinstance(reviewed_papers, dict):
+                raise ValueError("expected an object keyed by paper ID")
+            rows = [
+                (paper_id, data.get('reviewed_date', ''), _dumps(data.get('paper_data') or {}))
+                for paper_id, data in reviewed_papers.items()
+                if isinstance(data, dict)
+            ]
+        except (ValueError, TypeError, IOError) as e:
+            # Leave an unreadable file in place so the user's history is not lost
+            print(f"Warning: Could not import {self.storage_file}: {e}")
+            return
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR IGNORE INTO reviewed VALUES (?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                print(f"Warning: Could not import {self.storage_file}: {e}")
+                return
+            self._conn.execute("COMMIT")
+
+        os.replace(self.storage_file, self.storage_file + ".migrated")
 
     def mark_as_reviewed(self, paper_id: str, paper_data: Optional[Dict] = None):
         """
@@ -46,15 +96,12 @@ class ReviewedPapersManager:
             paper_id: Unique identifier for the paper (DOI or OpenAlex ID)
             paper_data: Optional paper metadata (title, authors, etc.)
         """
-        reviewed_papers = self._load_reviewed_papers()
-
-        # Store paper with review timestamp
-        reviewed_papers[paper_id] = {
-            'reviewed_date': datetime.now().isoformat(),
-            'paper_data': paper_data or {}
-        }
-
-        self._save_reviewed_papers(reviewed_papers)
+        # Store paper with review timestamp (touches only this row)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reviewed VALUES (?, ?, ?)",
+                (paper_id, datetime.now().isoformat(), _dumps(paper_data or {}))
+            )
 
     def is_reviewed(self, paper_id: str) -> bool:
         """
@@ -66,8 +113,33 @@ class ReviewedPapersManager:
         Returns:
             True if paper has been reviewed, False otherwise
         """
-        reviewed_papers = self._load_reviewed_papers()
-        return paper_id in reviewed_papers
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM reviewed WHERE paper_id = ?", (paper_id,)
+            ).fetchone()
+        return row is not None
+
+    def get_reviewed_ids(self, paper_ids: List[str]) -> Set[str]:
+        """
+        Check many papers at once.
+
+        Args:
+            paper_ids: Unique identifiers to check (DOI or OpenAlex ID)
+
+        Returns:
+            The subset of paper_ids that have been reviewed
+        """
+        reviewed = set()
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(paper_ids), 900):
+                chunk = paper_ids[start:start + 900]
+                rows = self._conn.execute(
+                    f"SELECT paper_id FROM reviewed WHERE paper_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                reviewed.update(paper_id for (paper_id,) in rows)
+        return reviewed
 
     def get_all_reviewed(self) -> List[Dict]:
         """
@@ -76,28 +148,30 @@ class ReviewedPapersManager:
         Returns:
             List of reviewed papers with review dates
         """
-        reviewed_papers = self._load_reviewed_papers()
+        # Sort by review date (most recent first)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT paper_id, reviewed_date, paper_data FROM reviewed ORDER BY reviewed_date DESC"
+            ).fetchall()
 
         result = []
-        for paper_id, data in reviewed_papers.items():
-            paper_info = data.get('paper_data', {})
+        for paper_id, reviewed_date, paper_data in rows:
+            paper_info = _loads(paper_data) if paper_data else {}
             paper_info['paper_id'] = paper_id
-            paper_info['reviewed_date'] = data.get('reviewed_date')
+            paper_info['reviewed_date'] = reviewed_date
             result.append(paper_info)
 
-        # Sort by review date (most recent first)
-        result.sort(key=lambda x: x.get('reviewed_date', ''), reverse=True)
-
         return result
 
     def clear_all(self):
         """Clear all reviewed papers."""
-        if os.path.exists(self.storage_file):
-            os.remove(self.storage_file)
+        with self._lock:
+            self._conn.execute("DELETE FROM reviewed")
 
     def get_stats(self) -> Dict:
         """Get statistics about reviewed papers."""
-        reviewed_papers = self._load_reviewed_papers()
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COUNT(*) FROM reviewed").fetchone()
         return {
-            'total_reviewed': len(reviewed_papers)
+            'total_reviewed': total
         }
@@ -2,17 +2,274 @@
 Content similarity engine using sentence transformers for paper embeddings.
 """
 import os
+import json
 import pickle
-from typing import List, Dict, Optional
+import sqlite3
+import hashlib
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Optional, Tuple
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
-from scipy.spatial.distance import cosine
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib json module
+    orjson = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+def _l2_normalize(embeddings: np.ndarray) -> np.ndarray:
+    """Return row-wise L2-normalized float32 copy of an embedding matrix."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0  # Leave all-zero rows as zeros
+    return embeddings / norms
+
+
+# Upper bound on the text the encoder can see: all-MiniLM-L6-v2 truncates at
+# max_seq_length 256 word pieces (roughly 1k characters), and 2k characters
+# also covers 512-token models. Fixed rather than read from the model so cache
+# keys can be computed without loading it
+_MAX_TEXT_CHARS = 2048
+
+
+def _canon(text: str) -> str:
+    """Canonical form of a text for embedding: lowercased, whitespace-collapsed, truncated."""
+    return " ".join(text.lower().split())[:_MAX_TEXT_CHARS]
+
+
+def library_cache_exists(cache_dir: str, collection_key: str) -> bool:
+    """
+    Check whether a library profile is cached for a collection.
+
+    A legacy pickled cache counts too: build_library_profile converts it to
+    the .npy/.json layout on first load.
+    """
+    return any(
+        os.path.exists(os.path.join(cache_dir, f"library_embeddings_{collection_key}.{ext}"))
+        for ext in ("npy", "pkl")
+    )
+
+
+def _paper_text(paper: Dict) -> str:
+    """Text representation of a paper: title plus abstract when available."""
+    title = paper.get('title', '')
+    abstract = paper.get('abstract', '')
+    return f"{title}. {abstract}" if abstract else title
+
+
+# Cached candidate embeddings unused for this many days are pruned; library
+# rows are pinned (last_used NULL) so incremental rebuilds can always reuse them
+_EMB_CACHE_MAX_AGE_DAYS = 90
+
+
+def _today() -> int:
+    """Current day number, the granularity of embedding cache last-use stamps."""
+    return int(time.time() // 86400)
+
+
+# ONNX model files shipped with sentence-transformers models, per backend
+_ONNX_MODEL_FILES = {
+    "onnx": "onnx/model_O3.onnx",  # Fused attention/LayerNorm/GELU kernels
+    "onnx-int8": "onnx/model_qint8_avx512.onnx",  # INT8 weights, AVX-512 VNNI kernels
+}
+
+# Texts per worker task when encoding across processes; halved on worker OOM
+_ENCODE_CHUNK = 2000
+_MIN_ENCODE_CHUNK = 250
+
+_worker_model = None
+
+
+def _init_encode_worker(model_name: str, load_kwargs: Dict, num_threads: int):
+    """Load one model per encoding worker process."""
+    global _worker_model
+    torch.set_num_threads(num_threads)  # Split cores between workers instead of oversubscribing
+    _worker_model = SentenceTransformer(model_name, **load_kwargs)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    """Encode one chunk of texts in a worker process."""
+    return _worker_model.encode(texts, batch_size=128, convert_to_numpy=True, normalize_embeddings=True)
+
+
+# With SIMILARITY_INDEX=hnsw, libraries at least this large are searched
+# through an HNSW index (requires faiss)
+_ANN_MIN_LIBRARY_SIZE = 5000
+
+
+# Library rows upcast to float32 per block (~1.5 MB for 384-d), keeping the
+# temporary copy cache-resident during the matrix product
+_LIBRARY_BLOCK_ROWS = 1024
+
+
+def _cosine_scores(queries: np.ndarray, library: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarities between unit-length query and library rows.
+
+    A float32 library is scored with a single matrix product. A float16
+    library is upcast to float32 one block of rows at a time rather than
+    all at once.
+
+    Returns:
+        Float32 array of shape (len(queries), len(library))
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    if library.dtype == np.float32:
+        # Nothing to upcast: one SGEMM over the whole library
+        return queries @ library.T
+
+    scores = np.empty((len(queries), len(library)), dtype=np.float32)
+    for start in range(0, len(library), _LIBRARY_BLOCK_ROWS):
+        block = np.asarray(library[start:start + _LIBRARY_BLOCK_ROWS], dtype=np.float32)
+        scores[:, start:start + len(block)] = queries @ block.T
+    return scores
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _batch_cosine(queries, library):
+        """Dot products of contiguous float32 query and library rows, without BLAS."""
+        n_queries, dim = queries.shape
+        n_library = library.shape[0]
+        scores = np.empty((n_queries, n_library), dtype=np.float32)
+        for i in prange(n_queries):
+            for j in range(n_library):
+                acc = np.float32(0.0)
+                for k in range(dim):
+                    acc += queries[i, k] * library[j, k]
+                scores[i, j] = acc
+        return scores
+
+    @njit(parallel=True, cache=True)
+    def _rank(scores, top_k):
+        """Per-row top_k (indices, scores), best first, by parallel insertion selection."""
+        n_rows, n_cols = scores.shape
+        k = min(top_k, n_cols)
+        top_idx = np.empty((n_rows, k), dtype=np.int64)
+        top_scores = np.empty((n_rows, k), dtype=np.float32)
+        for i in prange(n_rows):
+            filled = 0
+            for j in range(n_cols):
+                score = scores[i, j]
+                if filled < k:
+                    pos = filled
+                    filled += 1
+                elif score > top_scores[i, k - 1]:
+                    pos = k - 1
+                else:
+                    continue
+                # Shift lower scores down; ties keep the earlier library row first
+                while pos > 0 and top_scores[i, pos - 1] < score:
+                    top_scores[i, pos] = top_scores[i, pos - 1]
+                    top_idx[i, pos] = top_idx[i, pos - 1]
+                    pos -= 1
+                top_scores[i, pos] = score
+                top_idx[i, pos] = j
+        return top_idx, top_scores
+else:
+    _batch_cosine = None
+    _rank = None
+
+
+if simsimd is not None:
+    def _simsimd_cosine(queries, library):
+        """Cosine similarities of contiguous same-dtype query and library rows via SimSIMD."""
+        return 1.0 - np.asarray(simsimd.cdist(queries, library, metric="cosine"), dtype=np.float32)
+else:
+    _simsimd_cosine = None
+
+
+def _as_float32(embeddings: np.ndarray) -> np.ndarray:
+    """Contiguous float32 copy (or view) of an embedding matrix."""
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+def _quantize_int8(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Quantize unit-length rows to int8 by scaling with 127.
+
+    Cosine similarity is scale-invariant, so no per-row scale needs to be
+    kept; rounding error stays around 1e-2 in the scores.
+    """
+    scaled = np.rint(np.asarray(embeddings, dtype=np.float32) * 127.0)
+    return np.ascontiguousarray(np.clip(scaled, -127, 127), dtype=np.int8)
+
+
+# SIMILARITY_KERNEL name -> (input preparation, scoring function)
+_KERNELS = {
+    "numba": (_as_float32, _batch_cosine),
+    "simsimd": (_as_float32, _simsimd_cosine),
+    "simsimd-int8": (_quantize_int8, _simsimd_cosine),  # 4x less memory traffic than float32
+}
+
+
+def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Indices of the top_k highest scores, best first.
+
+    Uses an O(N) argpartition to isolate the top_k and only sorts those,
+    instead of sorting all N scores.
+    """
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if top_k < len(scores):
+        top_idx = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        top_idx = np.arange(len(scores))
+    return top_idx[np.argsort(-scores[top_idx])]
+
+
+def _top_k_rows(scores: np.ndarray, top_k: int):
+    """
+    Per-row top_k of a 2-D score matrix, best first.
+
+    Returns:
+        (indices, scores) arrays of shape (len(scores), min(top_k, n_columns))
+    """
+    top_k = min(top_k, scores.shape[1])
+    if top_k < scores.shape[1]:
+        top_idx = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    else:
+        top_idx = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    top_scores = np.take_along_axis(scores, top_idx, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top_idx, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+# Candidates scored per block, so at most a [block, library] score matrix exists at once
+_CANDIDATE_BLOCK_ROWS = 256
+
+# Library matches remembered per scored candidate, so explanations need no re-encode
+_STASHED_MATCHES = 10
 
 
 class SimilarityEngine:
     """Engine for computing semantic similarity between papers."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_dir: str = ".cache", collection_key: Optional[str] = None):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_dir: str = ".cache", collection_key: Optional[str] = None,
+                 backend: Optional[str] = None, num_threads: Optional[int] = None,
+                 encode_processes: Optional[int] = None):
         """
         Initialize similarity engine.
 
@@ -20,46 +277,320 @@ class SimilarityEngine:
             model_name: Name of sentence-transformers model to use
             cache_dir: Directory for caching embeddings
             collection_key: Optional key to namespace cache per Zotero collection
+            backend: Encoder backend: "torch", "onnx" (O3-optimized graph) or
+                "onnx-int8" (AVX-512 quantized graph). Defaults to the
+                EMBEDDING_BACKEND environment variable, then "torch"
+            num_threads: Optional number of intra-op CPU threads for torch
+            encode_processes: Worker processes for encoding large batches on
+                CPU. Defaults to the ENCODE_PROCESSES environment variable,
+                then 1 (encode in-process)
         """
         self.model_name = model_name
         self.cache_dir = cache_dir
         self.collection_key = collection_key or "all"
         self.model = None
+        # Library layout: one row-major (C-contiguous) [N, d] matrix, rows
+        # L2-normalized, stored as float16 and upcast to float32 for scoring.
+        # Norms are not kept separately: unit rows make cosine a dot product.
         self.library_embeddings = None
         self.library_papers = None
+        self._library_tensor = None  # (source array, device tensor) for GPU scoring
+        self._library_prepared = None  # (source array, preparation, prepared copy) for Numba/SimSIMD kernels
+        self._ann_index = None  # (source array, FAISS HNSW index) for large libraries
+        # (source array, {text key: [[row, score], ...]}) from the last compute_similarity
+        self._top_matches = None
+        # "numba", "simsimd" or "simsimd-int8" scores with that kernel instead of BLAS
+        self.similarity_kernel = os.getenv("SIMILARITY_KERNEL", "blas")
+        # "hnsw" searches large libraries approximately through FAISS instead of exactly
+        self.similarity_index = os.getenv("SIMILARITY_INDEX", "exact")
+        # ONNX backends run the encoder on ONNX Runtime (requires sentence-transformers[onnx])
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.encode_processes = encode_processes or int(os.getenv("ENCODE_PROCESSES", "1"))
+        self._model_lock = threading.Lock()
+        self._load_thread = None
 
         os.makedirs(cache_dir, exist_ok=True)
 
+        # Persistent text -> embedding cache shared by library and candidates
+        self._emb_cache_lock = threading.Lock()
+        self._emb_cache = sqlite3.connect(
+            os.path.join(cache_dir, "emb_cache.sqlite"), check_same_thread=False
+        )
+        self._emb_cache.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, vec BLOB, last_used INTEGER)"
+        )
+        columns = [row[1] for row in self._emb_cache.execute("PRAGMA table_info(cache)")]
+        if 'last_used' not in columns:
+            # Caches from before pruning: start every row's clock today
+            self._emb_cache.execute("ALTER TABLE cache ADD COLUMN last_used INTEGER")
+            self._emb_cache.execute("UPDATE cache SET last_used = ?", (_today(),))
+        self._emb_cache.execute(
+            "DELETE FROM cache WHERE last_used < ?", (_today() - _EMB_CACHE_MAX_AGE_DAYS,)
+        )
+        self._emb_cache.commit()
+
     def load_model(self):
-        """Load the sentence transformer model."""
-        if self.model is None:
-            print(f"Loading embedding model: {self.model_name}...")
-            self.model = SentenceTransformer(self.model_name)
-            print("Model loaded successfully.")
+        """Load the sentence transformer model (waits for a preload in progress)."""
+        with self._model_lock:
+            if self.model is None:
+                print(f"Loading embedding model: {self.model_name}...")
+                self.model = SentenceTransformer(self.model_name, **self._model_load_kwargs())
+                if self.backend not in _ONNX_MODEL_FILES:
+                    device = getattr(self.model, 'device', None)
+                    if isinstance(device, torch.device) and device.type == 'cuda':
+                        # FP16 inference runs on the GPU's tensor cores
+                        self.model.half()
+                print("Model loaded successfully.")
+
+    def _model_load_kwargs(self) -> Dict:
+        """SentenceTransformer keyword arguments for the configured backend."""
+        if self.backend in _ONNX_MODEL_FILES:
+            return {"backend": "onnx", "model_kwargs": {"file_name": _ONNX_MODEL_FILES[self.backend]}}
+        return {}
+
+    def preload_model(self):
+        """
+        Start loading the model in a background thread.
 
-    def build_library_profile(self, papers: List[Dict], force_rebuild: bool = False):
+        Later load_model calls wait for it instead of loading again. If the
+        background load fails, the next load_model call retries and raises.
+        Skipped when encoding across worker processes, which load their own
+        models: the in-process copy is then loaded only if needed.
+        """
+        if self.encode_processes > 1:
+            return
+        if self.model is None and self._load_thread is None:
+            self._load_thread = threading.Thread(target=self._preload, daemon=True)
+            self._load_thread.start()
+
+    def _preload(self):
+        try:
+            self.load_model()
+        except Exception as e:
+            print(f"Background model load failed: {e}")
+
+    def _embedding_key(self, text: str) -> str:
+        """Content hash identifying a text's embedding under the current model."""
+        # Quantized/exported graphs give slightly different vectors, so cache them apart
+        model_id = self.model_name if self.backend == "torch" else f"{self.model_name}@{self.backend}"
+        return hashlib.blake2b(f"{model_id}|{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def _encode_cached(self, texts: List[str], show_progress_bar: bool = False,
+                       pin_first: int = 0) -> np.ndarray:
+        """
+        Encode texts into unit-length embeddings, reusing the on-disk cache.
+
+        Texts are canonicalized first, so copies differing only in case or
+        whitespace share one embedding. Only texts whose embedding is not
+        cached yet are sent to the model (which is loaded lazily, so fully
+        cached runs never load it). New embeddings are stored as float16 to
+        halve the cache size.
+
+        Every lookup stamps the rows it uses with today's date, and rows
+        unused for _EMB_CACHE_MAX_AGE_DAYS are pruned when the engine opens
+        the cache, so daily candidate harvests do not grow it without bound.
+
+        Args:
+            texts: Texts to encode
+            show_progress_bar: Show the encoder's progress bar for misses
+            pin_first: Number of leading texts (library papers) whose cache
+                rows are pinned and never pruned
+
+        Returns:
+            Float32 array of shape (len(texts), dim), in input order
+        """
+        texts = [_canon(text) for text in texts]
+        keys = [self._embedding_key(text) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+        pinned = set(keys[:pin_first])
+        found = {}
+
+        # Bulk lookup, chunked to stay under SQLite's bound-parameter limit
+        with self._emb_cache_lock:
+            for start in range(0, len(unique_keys), 900):
+                chunk = unique_keys[start:start + 900]
+                rows = self._emb_cache.execute(
+                    f"SELECT key, vec FROM cache WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, vec in rows:
+                    found[key] = np.frombuffer(vec, dtype=np.float16).astype(np.float32)
+
+            # Stamp hits as used today; pinned rows keep a NULL stamp
+            today = _today()
+            hits = list(found)
+            for start in range(0, len(hits), 900):
+                chunk = hits[start:start + 900]
+                pinned_chunk = [key for key in chunk if key in pinned]
+                recent_chunk = [key for key in chunk if key not in pinned]
+                if pinned_chunk:
+                    self._emb_cache.execute(
+                        f"UPDATE cache SET last_used = NULL WHERE key IN ({','.join('?' * len(pinned_chunk))})",
+                        pinned_chunk
+                    )
+                if recent_chunk:
+                    self._emb_cache.execute(
+                        f"UPDATE cache SET last_used = ? WHERE last_used < ? "
+                        f"AND key IN ({','.join('?' * len(recent_chunk))})",
+                        [today, today] + recent_chunk
+                    )
+            self._emb_cache.commit()
+
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in misses:
+                misses[key] = text
+
+        if misses:
+            new_embeddings = self._encode(list(misses.values()), show_progress_bar)
+            found.update(zip(misses.keys(), np.asarray(new_embeddings, dtype=np.float32)))
+
+            with self._emb_cache_lock:
+                self._emb_cache.executemany(
+                    "INSERT OR IGNORE INTO cache (key, vec, last_used) VALUES (?, ?, ?)",
+                    [(key, found[key].astype(np.float16).tobytes(), None if key in pinned else today)
+                     for key in misses if key in found]
+                )
+                self._emb_cache.commit()
+
+        # Re-normalize so float16 round-off in cached rows doesn't skew scores
+        return _l2_normalize(np.vstack([found[key] for key in keys]))
+
+    def _encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Encode texts into unit-length embeddings with the model.
+
+        Large CPU batches are spread over encode_processes worker processes
+        when configured; everything else is encoded in-process.
+        """
+        if (self.encode_processes > 1 and len(texts) >= 2 * _MIN_ENCODE_CHUNK
+                and not torch.cuda.is_available()):
+            embeddings = self._encode_chunked(texts)
+            if embeddings is not None:
+                return embeddings
+
+        self.load_model()
+        # encode() already length-sorts its inputs, so each batch pads only
+        # to similar lengths and a large batch size doesn't waste FLOPs
+        return self.model.encode(
+            texts,
+            show_progress_bar=show_progress_bar,
+            batch_size=128,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+    def _encode_chunked(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Encode texts in chunks across worker processes, one model per worker.
+
+        A worker dying (typically out of memory) retries with half the chunk
+        size. Returns None if even the smallest chunks fail, so the caller
+        can fall back to in-process encoding.
+        """
+        workers = min(self.encode_processes, os.cpu_count() or 1)
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        chunk = min(_ENCODE_CHUNK, max(_MIN_ENCODE_CHUNK, len(texts) // workers))
+
+        while chunk >= _MIN_ENCODE_CHUNK:
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_encode_worker,
+                    initargs=(self.model_name, self._model_load_kwargs(), threads_per_worker)
+                ) as executor:
+                    parts = list(executor.map(
+                        _encode_in_worker, [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+                    ))
+                return np.vstack(parts)
+            except (BrokenProcessPool, MemoryError) as e:
+                print(f"Encoding worker failed ({e!r}); retrying with chunks of {chunk // 2}...")
+                chunk //= 2
+
+        print("Falling back to in-process encoding.")
+        return None
+
+    def _similarity_matrix(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarities between unit-length queries and the library.
+
+        When the model runs on a GPU, the library is kept there as a float32
+        tensor (uploaded once per library) and the product runs on-device,
+        copying only the score matrix back. Otherwise scores are computed with
+        NumPy/BLAS on the CPU, or with the kernel named by SIMILARITY_KERNEL
+        ("numba", "simsimd" or "simsimd-int8") when its package is installed.
+
+        Returns:
+            Float32 array of shape (len(queries), len(library))
+        """
+        device = self._cuda_device()
+        if device is None:
+            prepare, kernel = _KERNELS.get(self.similarity_kernel, (None, None))
+            if kernel is not None:
+                # The library is converted once per library, queries on every call
+                cached = self._library_prepared
+                if cached is None or cached[0] is not self.library_embeddings or cached[1] is not prepare:
+                    self._library_prepared = (self.library_embeddings, prepare, prepare(self.library_embeddings))
+                return kernel(prepare(queries), self._library_prepared[2])
+            return _cosine_scores(queries, self.library_embeddings)
+
+        queries_t = torch.from_numpy(np.asarray(queries, dtype=np.float32)).to(device)
+        return torch.matmul(queries_t, self._device_library(device).T).cpu().numpy()
+
+    def _cuda_device(self) -> Optional[torch.device]:
+        """The model's CUDA device, or None when it runs on the CPU."""
+        device = getattr(self.model, 'device', None)
+        if isinstance(device, torch.device) and device.type == 'cuda':
+            return device
+        return None
+
+    def _device_library(self, device: torch.device) -> torch.Tensor:
+        """The library as a float32 tensor on device, uploaded once per library."""
+        if self._library_tensor is None or self._library_tensor[0] is not self.library_embeddings:
+            library_t = torch.from_numpy(np.asarray(self.library_embeddings, dtype=np.float32)).to(device)
+            self._library_tensor = (self.library_embeddings, library_t)
+        return self._library_tensor[1]
+
+    def _device_top_k(self, queries: np.ndarray, k: int,
+                      device: torch.device) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k library matches per query, scored and ranked on device.
+
+        Only the (len(queries), k) results are copied back to the host,
+        not the full score matrix.
+
+        Returns:
+            (indices, scores) arrays of shape (len(queries), k), best first
+        """
+        queries_t = torch.from_numpy(np.asarray(queries, dtype=np.float32)).to(device)
+        scores_t, indices_t = torch.topk(torch.matmul(queries_t, self._device_library(device).T), k, dim=1)
+        return indices_t.cpu().numpy().astype(np.int64), scores_t.cpu().numpy()
+
+    def build_library_profile(self, papers: List[Dict], force_rebuild: bool = False,
+                              rebuild_if_stale: bool = True):
         """
         Build embeddings for user's library papers.
 
+        A cached profile is reused only while it covers the same papers.
+        When the library changes, the profile is rebuilt, and only new or
+        edited papers reach the model: unchanged texts come from the
+        content-addressed embedding cache.
+
         Args:
             papers: List of paper dictionaries
             force_rebuild: Force rebuilding even if cache exists
+            rebuild_if_stale: Rebuild a cached profile that no longer matches
+                papers. Lazy loads pass False to keep the profile built by
+                init (e.g. with --max-papers) instead of re-embedding
         """
-        # Per-collection cache file to avoid cross-collection contamination
-        cache_file = os.path.join(self.cache_dir, f"library_embeddings_{self.collection_key}.pkl")
-
-        # Try to load from cache
-        if not force_rebuild and os.path.exists(cache_file):
-            print("Loading library embeddings from cache...")
-            with open(cache_file, 'rb') as f:
-                cache_data = pickle.load(f)
-                self.library_embeddings = cache_data['embeddings']
-                self.library_papers = cache_data['papers']
-                print(f"Loaded embeddings for {len(self.library_papers)} papers.")
-                return
-
-        # Build new embeddings
-        self.load_model()
+        # Per-collection cache files to avoid cross-collection contamination
+        embeddings_file = os.path.join(self.cache_dir, f"library_embeddings_{self.collection_key}.npy")
+        papers_file = os.path.join(self.cache_dir, f"library_papers_{self.collection_key}.json")
+        index_file = os.path.join(self.cache_dir, f"library_index_{self.collection_key}.faiss")
+        legacy_cache_file = os.path.join(self.cache_dir, f"library_embeddings_{self.collection_key}.pkl")
 
         # Filter papers with abstracts or titles
         valid_papers = [
@@ -67,44 +598,138 @@ class SimilarityEngine:
             if p.get('abstract') or p.get('title')
         ]
 
+        # Try to load from cache
+        if not force_rebuild:
+            if not os.path.exists(embeddings_file) and os.path.exists(legacy_cache_file):
+                self._migrate_pickle_cache(legacy_cache_file, embeddings_file, papers_file)
+
+            if os.path.exists(embeddings_file) and os.path.exists(papers_file):
+                with open(papers_file, 'rb') as f:
+                    data = f.read()
+                metadata = orjson.loads(data) if orjson is not None else json.loads(data)
+                if isinstance(metadata, list):
+                    metadata = {'papers': metadata}
+
+                stale = bool(valid_papers) and metadata['papers'] != valid_papers
+                if stale and rebuild_if_stale:
+                    print(f"Library changed since embeddings were cached "
+                          f"({len(metadata['papers'])} cached, {len(valid_papers)} now); rebuilding profile...")
+                else:
+                    if stale:
+                        print("Library changed since embeddings were cached; using the cached profile "
+                              "(run 'recommend.py init' to update it)")
+                    print("Loading library embeddings from cache...")
+                    # Memory-mapped: pages are read lazily as similarity blocks touch them
+                    self.library_embeddings = np.load(embeddings_file, mmap_mode='r')
+                    self.library_papers = metadata['papers']
+
+                    # Scoring assumes unit rows; normalize once and resave if the cache predates that
+                    if not metadata.get('normalized', False):
+                        self.library_embeddings = _l2_normalize(self.library_embeddings).astype(np.float16)
+                        self._save_library_cache(embeddings_file, papers_file)
+                    self._prepare_ann_index(index_file)
+                    print(f"Loaded embeddings for {len(self.library_papers)} papers.")
+                    return
+
         if not valid_papers:
             raise ValueError("No papers with abstracts or titles found in library.")
 
         print(f"Building embeddings for {len(valid_papers)} papers...")
 
-        # Create text representations
-        texts = []
-        for paper in valid_papers:
-            # Combine title and abstract for better representation
-            title = paper.get('title', '')
-            abstract = paper.get('abstract', '')
-
-            if abstract:
-                text = f"{title}. {abstract}"
-            else:
-                text = title
+        # Combine title and abstract for better representation
+        texts = [_paper_text(paper) for paper in valid_papers]
 
-            texts.append(text)
-
-        # Generate embeddings
-        self.library_embeddings = self.model.encode(
-            texts,
-            show_progress_bar=True,
-            batch_size=32
-        )
+        # Generate unit-length embeddings so cosine similarity is a dot product,
+        # kept in float16: halves memory and bytes moved per similarity pass
+        self.library_embeddings = self._encode_cached(
+            texts, show_progress_bar=True, pin_first=len(texts)
+        ).astype(np.float16)
 
         self.library_papers = valid_papers
 
         # Cache the results
         print("Saving embeddings to cache...")
-        with open(cache_file, 'wb') as f:
-            pickle.dump({
-                'embeddings': self.library_embeddings,
-                'papers': self.library_papers
-            }, f)
+        self._save_library_cache(embeddings_file, papers_file)
+        self._prepare_ann_index(index_file)
 
         print("Library profile built successfully.")
 
+    def _save_library_cache(self, embeddings_file: str, papers_file: str):
+        """
+        Write the library embeddings (.npy) and paper metadata (.json).
+
+        Embeddings must already be L2-normalized; the metadata records this so
+        loads can use them for dot-product scoring as-is.
+
+        Args:
+            embeddings_file: Destination for the float16 embedding matrix
+            papers_file: Destination for the paper metadata list
+        """
+        # Write to temporary files first so a mapped cache is never truncated in place
+        tmp_embeddings = embeddings_file + ".tmp.npy"
+        with open(tmp_embeddings, 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.library_embeddings, dtype=np.float16))
+        os.replace(tmp_embeddings, embeddings_file)
+
+        tmp_papers = papers_file + ".tmp"
+        metadata = {'normalized': True, 'papers': self.library_papers}
+        with open(tmp_papers, 'wb') as f:
+            f.write(orjson.dumps(metadata) if orjson is not None else json.dumps(metadata).encode('utf-8'))
+        os.replace(tmp_papers, papers_file)
+
+        # Any ANN index was built from the previous embeddings
+        index_file = os.path.join(self.cache_dir, f"library_index_{self.collection_key}.faiss")
+        if os.path.exists(index_file):
+            os.remove(index_file)
+
+    def _prepare_ann_index(self, index_file: str):
+        """
+        Load or build the HNSW index used to search large libraries.
+
+        Only used when SIMILARITY_INDEX is "hnsw", faiss is installed and the
+        library has at least _ANN_MIN_LIBRARY_SIZE papers; otherwise libraries
+        are scored exactly.
+
+        Args:
+            index_file: Path of the persisted index for this collection
+        """
+        self._ann_index = None
+        if (self.similarity_index != "hnsw" or faiss is None
+                or len(self.library_embeddings) < _ANN_MIN_LIBRARY_SIZE):
+            return
+
+        index = faiss.read_index(index_file) if os.path.exists(index_file) else None
+        if index is None or index.ntotal != len(self.library_embeddings):
+            print("Building approximate nearest-neighbor index...")
+            # Inner product on unit vectors is cosine similarity
+            index = faiss.IndexHNSWFlat(self.library_embeddings.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+            index.add(np.ascontiguousarray(self.library_embeddings, dtype=np.float32))
+            faiss.write_index(index, index_file)
+        index.hnsw.efSearch = 64
+        self._ann_index = (self.library_embeddings, index)
+
+    def _ann_search(self, queries: np.ndarray, k: int):
+        """
+        Top-k library matches from the HNSW index.
+
+        Returns:
+            (scores, indices) arrays of shape (len(queries), k), or None when
+            no index is available for the current library
+        """
+        if self._ann_index is None or self._ann_index[0] is not self.library_embeddings:
+            return None
+        return self._ann_index[1].search(np.ascontiguousarray(queries, dtype=np.float32), k)
+
+    def _migrate_pickle_cache(self, legacy_cache_file: str, embeddings_file: str, papers_file: str):
+        """Convert a legacy pickled library cache into the .npy/.json layout."""
+        with open(legacy_cache_file, 'rb') as f:
+            cache_data = pickle.load(f)
+        self.library_embeddings = _l2_normalize(cache_data['embeddings']).astype(np.float16)
+        self.library_papers = cache_data['papers']
+        self._save_library_cache(embeddings_file, papers_file)
+        os.remove(legacy_cache_file)
+
     def compute_similarity(self, candidate_papers: List[Dict]) -> List[Dict]:
         """
         Compute similarity scores for candidate papers against library.
@@ -118,8 +743,6 @@ class SimilarityEngine:
         if self.library_embeddings is None:
             raise ValueError("Library profile not built. Call build_library_profile first.")
 
-        self.load_model()
-
         # Filter candidates with text
         valid_candidates = [
             p for p in candidate_papers
@@ -130,46 +753,39 @@ class SimilarityEngine:
             return candidate_papers
 
         # Create text representations
-        texts = []
-        for paper in valid_candidates:
-            title = paper.get('title', '')
-            abstract = paper.get('abstract', '')
-
-            if abstract:
-                text = f"{title}. {abstract}"
-            else:
-                text = title
-
-            texts.append(text)
-
-        # Generate embeddings for candidates
-        candidate_embeddings = self.model.encode(
-            texts,
-            show_progress_bar=False,
-            batch_size=32
-        )
-
-        # Compute similarity scores
+        texts = [_paper_text(paper) for paper in valid_candidates]
+
+        # Generate unit-length embeddings for candidates
+        candidate_embeddings = self._encode_cached(texts)
+
+        ann = self._ann_search(candidate_embeddings, _STASHED_MATCHES)
+        if ann is not None:
+            # Large library: nearest library papers per candidate from the HNSW index
+            top_scores, top_indices = ann
+            # HNSW pads with -1 when it finds fewer neighbors than asked;
+            # candidates it found no neighbor for are scored exactly
+            missing = np.flatnonzero(top_indices[:, 0] < 0)
+            if len(missing):
+                top_indices[missing], top_scores[missing] = self._exact_top_k(
+                    candidate_embeddings[missing], top_indices.shape[1])
+        else:
+            top_indices, top_scores = self._exact_top_k(
+                candidate_embeddings, min(_STASHED_MATCHES, len(self.library_embeddings)))
+        max_similarities, most_similar_indices = top_scores[:, 0], top_indices[:, 0]
+
+        # Best library matches per candidate text, reused by
+        # get_most_similar_library_papers while this library is loaded
+        top_matches = {}
         scored_papers = []
-        for i, paper in enumerate(valid_candidates):
-            candidate_emb = candidate_embeddings[i]
-
-            # Compute similarity to all library papers
-            similarities = []
-            for j, lib_emb in enumerate(self.library_embeddings):
-                # Cosine similarity (1 - cosine distance)
-                sim = 1 - cosine(candidate_emb, lib_emb)
-                similarities.append((sim, j))
-
-            # Sort by similarity
-            similarities.sort(reverse=True, key=lambda x: x[0])
-
+        for paper, text, max_similarity, most_similar_idx, row_indices, row_scores in zip(
+                valid_candidates, texts, max_similarities, most_similar_indices, top_indices, top_scores):
             # Use max similarity to any library paper
-            max_similarity = similarities[0][0]
-            most_similar_idx = similarities[0][1]
-
             paper['similarity_score'] = float(max_similarity)
 
+            top_matches[self._embedding_key(_canon(text))] = [
+                [int(idx), float(score)] for idx, score in zip(row_indices, row_scores) if idx >= 0
+            ]
+
             # Store most similar library paper
             most_similar_paper = self.library_papers[most_similar_idx]
             paper['most_similar_paper'] = {
@@ -181,12 +797,44 @@ class SimilarityEngine:
 
             scored_papers.append(paper)
 
+        self._top_matches = (self.library_embeddings, top_matches)
         return scored_papers
 
+    def _exact_top_k(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k library matches per query from an exact scan of the library.
+
+        Cosine similarity of each block of queries to every library paper is a
+        matrix product (both sides are L2-normalized), reduced to the block's
+        top matches before the next block is scored.
+
+        Returns:
+            (indices, scores) arrays of shape (len(queries), k), best first
+        """
+        top_indices = np.empty((len(queries), k), dtype=np.int64)
+        top_scores = np.empty((len(queries), k), dtype=np.float32)
+        device = self._cuda_device()
+        for start in range(0, len(queries), _CANDIDATE_BLOCK_ROWS):
+            stop = start + _CANDIDATE_BLOCK_ROWS
+            if device is not None:
+                top_indices[start:stop], top_scores[start:stop] = self._device_top_k(
+                    queries[start:stop], k, device)
+                continue
+            similarities = self._similarity_matrix(queries[start:stop])
+            if self.similarity_kernel == "numba" and _rank is not None:
+                block_top = _rank(np.ascontiguousarray(similarities, dtype=np.float32), k)
+            else:
+                block_top = _top_k_rows(similarities, k)
+            top_indices[start:stop], top_scores[start:stop] = block_top
+        return top_indices, top_scores
+
     def get_most_similar_library_papers(self, paper: Dict, top_k: int = 3) -> List[Dict]:
         """
         Find most similar papers from library for a given paper.
 
+        Best library matches of papers scored by the last compute_similarity
+        are reused here; other papers are encoded and searched.
+
         Args:
             paper: Paper to compare
             top_k: Number of similar papers to return
@@ -197,29 +845,33 @@ class SimilarityEngine:
         if self.library_embeddings is None:
             raise ValueError("Library profile not built.")
 
-        self.load_model()
-
-        # Create text representation
-        title = paper.get('title', '')
-        abstract = paper.get('abstract', '')
-        text = f"{title}. {abstract}" if abstract else title
-
-        # Generate embedding
-        paper_emb = self.model.encode([text])[0]
-
-        # Compute similarities
-        similarities = []
-        for i, lib_emb in enumerate(self.library_embeddings):
-            sim = 1 - cosine(paper_emb, lib_emb)
-            similarities.append((sim, i))
-
-        # Get top-k
-        similarities.sort(reverse=True)
+        text_key = self._embedding_key(_canon(_paper_text(paper)))
+        stashed = None
+        if self._top_matches is not None and self._top_matches[0] is self.library_embeddings:
+            stashed = self._top_matches[1].get(text_key)
+        if stashed and (len(stashed) >= top_k or len(stashed) == len(self.library_papers)):
+            return self._library_matches(stashed[:top_k])
+
+        # Generate unit-length embedding
+        paper_emb = self._encode_cached([_paper_text(paper)])[0]
+
+        ann = self._ann_search(paper_emb[np.newaxis, :], top_k)
+        if ann is not None:
+            # HNSW pads with -1 when it finds fewer than top_k neighbors
+            matches = [(idx, score) for score, idx in zip(ann[0][0], ann[1][0]) if idx >= 0]
+        else:
+            # Cosine similarity to every library paper, then top-k without a full sort
+            similarities = self._similarity_matrix(paper_emb[np.newaxis, :])[0]
+            matches = [(idx, similarities[idx]) for idx in _top_k_indices(similarities, top_k)]
+
+        return self._library_matches(matches)
+
+    def _library_matches(self, matches) -> List[Dict]:
+        """Copies of the matched library papers annotated with their similarity."""
         top_papers = []
-
-        for sim, idx in similarities[:top_k]:
+        for idx, similarity in matches:
             lib_paper = self.library_papers[idx].copy()
-            lib_paper['similarity'] = float(sim)
+            lib_paper['similarity'] = float(similarity)
             top_papers.append(lib_paper)
 
         return top_papers
@@ -2,6 +2,7 @@
 Zotero API client for fetching user's research library.
 """
 import os
+import json
 from typing import List, Dict, Optional
 from pyzotero import zotero
 from dotenv import load_dotenv
@@ -10,8 +11,12 @@ from dotenv import load_dotenv
 class ZoteroClient:
     """Client for interacting with Zotero API."""
 
+    # Only journal articles, conference papers, preprints and reports are papers
+    VALID_ITEM_TYPES = frozenset({'journalArticle', 'conferencePaper', 'preprint', 'report'})
+
     def __init__(self, api_key: Optional[str] = None, user_id: Optional[str] = None,
-                 library_type: str = "user", collection_id: Optional[str] = None):
+                 library_type: str = "user", collection_id: Optional[str] = None,
+                 cache_dir: Optional[str] = None):
         """
         Initialize Zotero client.
 
@@ -20,6 +25,7 @@ class ZoteroClient:
             user_id: Zotero user ID (or set ZOTERO_USER_ID env var)
             library_type: Type of library (user or group)
             collection_id: Optional collection ID to filter items (or set ZOTERO_COLLECTION_ID env var)
+            cache_dir: Optional directory for caching the parsed library between runs
         """
         load_dotenv()
 
@@ -27,6 +33,7 @@ class ZoteroClient:
         self.user_id = user_id or os.getenv("ZOTERO_USER_ID")
         self.library_type = library_type or os.getenv("ZOTERO_LIBRARY_TYPE", "user")
         collection_input = collection_id or os.getenv("ZOTERO_COLLECTION_ID")
+        self.cache_dir = cache_dir
 
         if not self.api_key or not self.user_id:
             raise ValueError(
@@ -67,20 +74,74 @@ class ZoteroClient:
         # Use provided collection_id, fall back to instance collection_id
         target_collection = collection_id or self.collection_id
 
+        # Full fetches are cached against the library version; an unchanged
+        # library skips the download and parsing entirely
+        cache_file = None
+        version = None
+        if self.cache_dir and limit is None:
+            # Keyed by library too, so switching accounts or groups can't reuse another library's items
+            cache_file = os.path.join(
+                self.cache_dir,
+                f"zotero_library_{self.library_type}_{self.zot.library_id}_{target_collection or 'all'}.json"
+            )
+            version = self._library_version()
+            cached = self._load_cached_library(cache_file, version)
+            if cached is not None:
+                return cached
+
         if target_collection:
             print(f"Fetching items from collection: {target_collection}")
             items = self.zot.everything(self.zot.collection_items(target_collection, limit=limit))
         else:
             items = self.zot.everything(self.zot.top(limit=limit))
 
-        papers = []
-        for item in items:
-            paper = self._parse_item(item)
-            if paper:
-                papers.append(paper)
+        # Skip non-paper items (notes, attachments) before parsing them
+        valid_types = self.VALID_ITEM_TYPES
+        papers = [
+            paper for paper in (
+                self._parse_item(item) for item in items
+                if item.get('data', {}).get('itemType') in valid_types
+            )
+            if paper
+        ]
+
+        if cache_file and version is not None:
+            self._save_cached_library(cache_file, version, papers)
 
         return papers
 
+    def _library_version(self) -> Optional[int]:
+        """Current Zotero library version, or None if it can't be determined."""
+        try:
+            version = self.zot.last_modified_version()
+        except Exception as e:
+            print(f"Could not check Zotero library version: {e}")
+            return None
+        return version if isinstance(version, int) else None
+
+    def _load_cached_library(self, cache_file: str, version: Optional[int]) -> Optional[List[Dict]]:
+        """Return the cached papers if they were saved at this library version."""
+        if version is None or not os.path.exists(cache_file):
+            return None
+        try:
+            with open(cache_file, 'r') as f:
+                cached = json.load(f)
+        except (ValueError, IOError):
+            return None
+        if (not isinstance(cached, dict) or cached.get('version') != version
+                or not isinstance(cached.get('papers'), list)):
+            return None
+        print(f"Zotero library unchanged (version {version}); using cached items.")
+        return cached['papers']
+
+    def _save_cached_library(self, cache_file: str, version: int, papers: List[Dict]):
+        """Save parsed papers together with the library version they came from."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({'version': version, 'papers': papers}, f)
+        os.replace(tmp_file, cache_file)
+
     def _parse_item(self, item: Dict) -> Optional[Dict]:
         """
         Parse Zotero item into standardized paper format.
@@ -95,13 +156,17 @@ class ZoteroClient:
         item_type = data.get('itemType', '')
 
         # Only process journal articles, conference papers, preprints
-        valid_types = {'journalArticle', 'conferencePaper', 'preprint', 'report'}
-        if item_type not in valid_types:
+        if item_type not in self.VALID_ITEM_TYPES:
+            return None
+
+        # Skip items without title
+        title = data.get('title', '')
+        if not title:
             return None
 
         # Extract key fields
         paper = {
-            'title': data.get('title', ''),
+            'title': title,
             'abstract': data.get('abstractNote', ''),
             'authors': self._extract_authors(data.get('creators', [])),
             'year': data.get('date', '')[:4] if data.get('date') else None,
@@ -113,10 +178,6 @@ class ZoteroClient:
             'date_added': data.get('dateAdded', ''),
         }
 
-        # Skip items without title
-        if not paper['title']:
-            return None
-
         return paper
 
     def _extract_authors(self, creators: List[Dict]) -> List[str]:
@@ -129,15 +190,13 @@ class ZoteroClient:
         Returns:
             List of author name strings
         """
-        authors = []
-        for creator in creators:
-            if creator.get('creatorType') == 'author':
-                first = creator.get('firstName', '')
-                last = creator.get('lastName', '')
-                name = f"{first} {last}".strip()
-                if name:
-                    authors.append(name)
-        return authors
+        if not creators:
+            return []
+        names = (
+            f"{creator.get('firstName', '')} {creator.get('lastName', '')}".strip()
+            for creator in creators if creator.get('creatorType') == 'author'
+        )
+        return [name for name in names if name]
 
     def get_library_stats(self) -> Dict:
         """Get basic statistics about the library."""
@@ -160,19 +219,42 @@ class ZoteroClient:
             List of collection dictionaries with 'id', 'name', and 'num_items'
         """
         collections = self.zot.collections()
+        collection_list = self._list_collections_no_counts(collections)
 
-        collection_list = []
-        for col in collections:
-            col_data = col.get('data', {})
-            collection_list.append({
-                'id': col_data.get('key', ''),
-                'name': col_data.get('name', ''),
-                'num_items': self.zot.num_collectionitems(col_data.get('key', '')),
-                'parent': col_data.get('parentCollection', None)
-            })
+        # Item counts usually come with the listing; only fetch the missing ones.
+        # Sequentially: the pyzotero client keeps per-request state and is not thread-safe
+        counts = [col.get('meta', {}).get('numItems') for col in collections]
+        for i, count in enumerate(counts):
+            if count is None:
+                counts[i] = self.zot.num_collectionitems(collection_list[i]['id'])
+
+        for col, count in zip(collection_list, counts):
+            col['num_items'] = count
 
         return collection_list
 
+    def _list_collections_no_counts(self, collections: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        List collections without item counts.
+
+        Args:
+            collections: Raw Zotero collections (fetched if not given)
+
+        Returns:
+            List of collection dictionaries with 'id', 'name', and 'parent'
+        """
+        if collections is None:
+            collections = self.zot.collections()
+
+        return [
+            {
+                'id': col.get('data', {}).get('key', ''),
+                'name': col.get('data', {}).get('name', ''),
+                'parent': col.get('data', {}).get('parentCollection', None)
+            }
+            for col in collections
+        ]
+
     def find_collection_by_name(self, name: str) -> Optional[str]:
         """
         Find a collection ID by its name.
@@ -183,7 +265,8 @@ class ZoteroClient:
         Returns:
             Collection ID if found, None otherwise
         """
-        collections = self.list_collections()
+        # Names are all that's needed; skip the per-collection count requests
+        collections = self._list_collections_no_counts()
         name_lower = name.lower()
 
         # Try exact match first